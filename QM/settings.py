@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -83,12 +84,92 @@ WSGI_APPLICATION = "QM.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# QUIZMANIA_DB selects the backend: "sqlite" (default) or "postgres".
+#
+# The app runs as a single web worker: live session state (live.py), the
+# write-behind buffer and the locmem caches are per process, so a second
+# worker would serve diverging scoreboards and ETags. SQLite is tuned for that
+# worker's threads sharing the file with management commands (compact_history,
+# import_quizzes) and the write-behind flusher: WAL lets readers carry on
+# while a write commits, busy_timeout makes a writer wait for the lock instead
+# of failing with "database is locked", and IMMEDIATE transactions take the
+# write lock at BEGIN so a transaction that reads first cannot fail halfway.
+# CONN_MAX_AGE defaults to 0: under ASGI, Django advises against persistent
+# connections, since each request may run on a different thread.
+#
+# PostgreSQL uses psycopg's connection pool. psycopg is an optional extra and
+# not in requirements.txt: pip install "psycopg[binary,pool]".
+QUIZMANIA_DB = os.environ.get("QUIZMANIA_DB", "sqlite").lower()
+
+if QUIZMANIA_DB == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "quizmania"),
+            "USER": os.environ.get("POSTGRES_USER", "quizmania"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("QUIZMANIA_DB_POOL_MIN", "2")),
+                    "max_size": int(os.environ.get("QUIZMANIA_DB_POOL_MAX", "10")),
+                },
+            },
+        }
+    }
+elif QUIZMANIA_DB == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": Path(os.environ.get("QUIZMANIA_SQLITE_PATH", BASE_DIR / "db.sqlite3")),
+            "CONN_MAX_AGE": int(os.environ.get("QUIZMANIA_CONN_MAX_AGE", "0")),
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={int(os.environ.get('QUIZMANIA_SQLITE_BUSY_TIMEOUT', '5000'))};"
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"QUIZMANIA_DB must be 'sqlite' or 'postgres', not {QUIZMANIA_DB!r}")
+
+# Optional separate database for the live-session tables (QuizTaker and
+# UserResponse), so submit storms do not hold the lock quiz authoring and
+# history need. Same backend and options as "default"; QUIZMANIA_LIVE_DB_NAME
+# is a file path for SQLite or a database name for PostgreSQL. Migrate both:
+#   python manage.py migrate && python manage.py migrate --database live
+QUIZMANIA_LIVE_DB_NAME = os.environ.get("QUIZMANIA_LIVE_DB_NAME")
+if QUIZMANIA_LIVE_DB_NAME:
+    DATABASES["live"] = {**DATABASES["default"], "NAME": QUIZMANIA_LIVE_DB_NAME}
+    DATABASE_ROUTERS = ["QuizMania.routers.LiveRouter"]
+
+
+# Cache shared by the app: micro-cached live pages (QuizMania/microcache.py),
+# the quiz payload and the rendered answer reviews. QUIZMANIA_CACHE selects
+# the backend:
+#   locmem  per process (default)
+#   file    shared by the workers of one machine; QUIZMANIA_CACHE_LOCATION is a directory
+#   redis   any Redis-protocol server; QUIZMANIA_CACHE_LOCATION is its URL (needs the redis package)
+QUIZMANIA_CACHE = os.environ.get("QUIZMANIA_CACHE", "locmem").lower()
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "quizmania"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379"),
+}
+if QUIZMANIA_CACHE not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"QUIZMANIA_CACHE must be one of {', '.join(CACHE_BACKENDS)}, not {QUIZMANIA_CACHE!r}")
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": CACHE_BACKENDS[QUIZMANIA_CACHE][0],
+        "LOCATION": os.environ.get("QUIZMANIA_CACHE_LOCATION", CACHE_BACKENDS[QUIZMANIA_CACHE][1]),
     }
 }
+# Seconds a micro-cached response is reused; 0 turns micro-caching off
+QUIZMANIA_MICROCACHE_TIMEOUT = int(os.environ.get("QUIZMANIA_MICROCACHE_TIMEOUT", "2"))
 
 
 # Password validation
@@ -129,6 +210,24 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Quiz forms post about 9 fields per question and the AI generator allows
+# 200 questions, well past Django's default limit of 1000 fields.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 5000
+
+# Write-behind submission ingestion (see QuizMania/ingest.py). Off by default:
+# when enabled, quiz submissions are journaled to a per-process subdirectory
+# of QUIZMANIA_JOURNAL_DIR and written to the database in batches every QUIZMANIA_FLUSH_INTERVAL seconds.
+QUIZMANIA_WRITE_BEHIND = os.environ.get("QUIZMANIA_WRITE_BEHIND", "False").lower() == "true"
+QUIZMANIA_JOURNAL_DIR = Path(os.environ.get("QUIZMANIA_JOURNAL_DIR", BASE_DIR / "submission_journal"))
+QUIZMANIA_FLUSH_INTERVAL = float(os.environ.get("QUIZMANIA_FLUSH_INTERVAL", "1.0"))
+QUIZMANIA_FLUSH_BATCH = 500
+
+# History retention (see QuizMania/retention.py and the compact_history
+# command): records older than QUIZMANIA_HISTORY_RETENTION_DAYS are rolled up
+# into per-quiz totals per QUIZMANIA_HISTORY_ROLLUP_PERIOD (day, week or month).
+QUIZMANIA_HISTORY_RETENTION_DAYS = int(os.environ.get("QUIZMANIA_HISTORY_RETENTION_DAYS", "365"))
+QUIZMANIA_HISTORY_ROLLUP_PERIOD = os.environ.get("QUIZMANIA_HISTORY_ROLLUP_PERIOD", "month")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
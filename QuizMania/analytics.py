@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import Count, Prefetch
+
+from .models import Choice, ChoiceSummary, Question, QuestionSummary, UserResponse
+from .scoring import get_answer_key
+
+# Per-question analytics. Raw responses are read exactly once, by the
+# aggregate query in record_session() when a session ends; the totals are
+# added to QuestionSummary / ChoiceSummary and the report only reads those,
+# so its cost does not grow with the number of sessions a quiz has run.
+
+
+def record_session(quiz, attempts, taker_ids=None):
+    """
+    Adds the responses of the quiz's current takers (or only ``taker_ids``)
+    to its summaries. ``attempts`` is the number of takers in the session;
+    questions they did not answer count as blank.
+    """
+    if not attempts:
+        return
+
+    # The one query over raw responses: picks per choice for this session
+    responses = UserResponse.objects.filter(quiz_taker__quiz=quiz, selected_choice__isnull=False)
+    if taker_ids is not None:
+        responses = responses.filter(quiz_taker_id__in=taker_ids)
+    picks = dict(
+        responses
+        .values('selected_choice')
+        .annotate(n=Count('id'))
+        .values_list('selected_choice', 'n')
+    )
+
+    key = get_answer_key(quiz)
+    with transaction.atomic():
+        question_totals = {s.question_id: s for s in QuestionSummary.objects.filter(question__quiz=quiz)}
+        choice_totals = {s.choice_id: s for s in ChoiceSummary.objects.filter(choice__question__quiz=quiz)}
+
+        questions, choices = [], []
+        for question_id, question in key.questions.items():
+            summary = question_totals.get(question_id) or QuestionSummary(question_id=question_id)
+            summary.attempts += attempts
+            for choice_id in question.choice_ids:
+                count = picks.get(choice_id, 0)
+                summary.answered += count
+                if choice_id in question.correct_choice_ids:
+                    summary.correct += count
+                choice_summary = choice_totals.get(choice_id) or ChoiceSummary(choice_id=choice_id)
+                choice_summary.picks += count
+                choices.append(choice_summary)
+            questions.append(summary)
+
+        QuestionSummary.objects.bulk_create(
+            questions,
+            update_conflicts=True,
+            unique_fields=['question'],
+            update_fields=['attempts', 'answered', 'correct'],
+        )
+        ChoiceSummary.objects.bulk_create(
+            choices,
+            update_conflicts=True,
+            unique_fields=['choice'],
+            update_fields=['picks'],
+        )
+
+
+def clear(quiz):
+    QuestionSummary.objects.filter(question__quiz=quiz).delete()
+    ChoiceSummary.objects.filter(choice__question__quiz=quiz).delete()
+
+
+def question_report(quiz):
+    """
+    Per-question rows for the analytics page, read from the summaries only:
+    percent correct, blank answers and the distribution over choices.
+    """
+    questions = (
+        Question.objects.filter(quiz=quiz)
+        .select_related('summary')
+        .prefetch_related(Prefetch('choices', queryset=Choice.objects.select_related('summary').order_by('id')))
+        .order_by('id')
+    )
+
+    report = []
+    for question in questions:
+        summary = getattr(question, 'summary', None)
+        attempts = summary.attempts if summary else 0
+        answered = summary.answered if summary else 0
+        correct = summary.correct if summary else 0
+        choices = []
+        for choice in question.choices.all():
+            choice_summary = getattr(choice, 'summary', None)
+            picks = choice_summary.picks if choice_summary else 0
+            choices.append({'choice': choice, 'picks': picks, 'percent': _percent(picks, attempts)})
+
+        report.append({
+            'question': question,
+            'attempts': attempts,
+            'blank': attempts - answered,
+            'blank_percent': _percent(attempts - answered, attempts),
+            'correct_percent': _percent(correct, attempts),
+            'choices': choices,
+        })
+    return report
+
+
+def _percent(part, whole):
+    return round(part * 100 / whole, 1) if whole else 0
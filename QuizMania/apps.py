@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QuizmaniaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "QuizMania"
+
+    def ready(self):
+        # Clears live rows that deletes cannot cascade into
+        from . import signals  # noqa: F401
@@ -0,0 +1,150 @@
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import analytics
+from .models import ArchivedResponse, QuizHistory, QuizTaker, UserResponse
+from .scoring import get_answer_key
+
+# Ending a session moves its takers and their answers out of the live tables.
+#
+# When the live tables share the history's database (the default), it is one
+# transaction of set-based statements whose cost does not depend on Python
+# looping over rows:
+#
+#   QuizTaker    --INSERT ... SELECT-->  QuizHistory (one row per taker)
+#   UserResponse --INSERT ... SELECT-->  ArchivedResponse (joined on source_taker_id)
+#   then both live tables are cleared with one DELETE each.
+#
+# Either the whole session is archived and cleared, or nothing changes.
+#
+# When the live tables have their own database (see routers.py) no single
+# transaction spans both, so the session is moved in two steps:
+#
+#   1. A transaction on the live database locks the session's rows (the
+#      write lock taken by SQLite's IMMEDIATE transactions in the settings
+#      profile, FOR UPDATE on PostgreSQL) and reads them.
+#   2. Inside it, the copies are written to the default database and committed.
+#   3. The live rows are deleted and the live transaction commits.
+#
+# A failure before 2 commits changes nothing. A failure between 2 and 3
+# leaves the takers in the live tables although they are already archived;
+# every QuizHistory row keeps its source_taker_id (ids are never reused), so
+# the next end of the session skips takers already archived and only clears
+# them. A session is therefore archived exactly once, even across crashes.
+
+
+def _table(model):
+    return connections[router.db_for_write(model)].ops.quote_name(model._meta.db_table)
+
+
+def _column(model, field):
+    return connections[router.db_for_write(model)].ops.quote_name(model._meta.get_field(field).column)
+
+
+def archive_session(quiz):
+    """
+    Archives the quiz's current takers and responses and clears them from
+    the live tables. Returns the number of takers archived.
+    """
+    if router.db_for_write(QuizTaker) != router.db_for_write(QuizHistory):
+        return _archive_across_databases(quiz)
+
+    db = router.db_for_write(QuizHistory)
+    connection = connections[db]
+    # One timestamp for the whole session, so its records can be grouped later
+    ended_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    H, T, R, A = QuizHistory, QuizTaker, UserResponse, ArchivedResponse
+
+    with transaction.atomic(using=db), connection.cursor() as cursor:
+        # Write first: on SQLite a transaction that starts by reading cannot take the write lock later
+        cursor.execute(
+            f"INSERT INTO {_table(H)} ({_column(H, 'quiz')}, {_column(H, 'player_name')}, {_column(H, 'score')},"
+            f" {_column(H, 'completed_at')}, {_column(H, 'source_taker_id')})"
+            f" SELECT {_column(T, 'quiz')}, {_column(T, 'alias')}, {_column(T, 'score')}, %s, {_column(T, 'id')}"
+            f" FROM {_table(T)} WHERE {_column(T, 'quiz')} = %s",
+            [ended_at, quiz.id],
+        )
+        archived = cursor.rowcount
+
+        if archived:
+            # Fold the answers into the per-question summaries before they leave the live table
+            analytics.record_session(quiz, archived)
+
+            cursor.execute(
+                f"INSERT INTO {_table(A)} ({_column(A, 'history')}, {_column(A, 'question')}, {_column(A, 'selected_choice')})"
+                f" SELECT h.{_column(H, 'id')}, r.{_column(R, 'question')}, r.{_column(R, 'selected_choice')}"
+                f" FROM {_table(R)} r INNER JOIN {_table(H)} h ON h.{_column(H, 'source_taker_id')} = r.{_column(R, 'quiz_taker')}"
+                f" WHERE h.{_column(H, 'quiz')} = %s AND h.{_column(H, 'completed_at')} = %s",
+                [quiz.id, ended_at],
+            )
+            cursor.execute(
+                f"DELETE FROM {_table(R)} WHERE {_column(R, 'quiz_taker')} IN"
+                f" (SELECT {_column(T, 'id')} FROM {_table(T)} WHERE {_column(T, 'quiz')} = %s)",
+                [quiz.id],
+            )
+            cursor.execute(f"DELETE FROM {_table(T)} WHERE {_column(T, 'quiz')} = %s", [quiz.id])
+
+        # Update quiz timestamp to mark as recently active
+        quiz.last_session_size = archived
+        quiz.save()
+    return archived
+
+
+def _archive_across_databases(quiz):
+    live_db = router.db_for_write(QuizTaker)
+    ended_at = timezone.now()
+
+    with transaction.atomic(using=live_db):
+        takers = list(QuizTaker.objects.select_for_update().filter(quiz=quiz).values_list('id', 'alias', 'score'))
+        taker_ids = [taker_id for taker_id, _, _ in takers]
+        archived = _copy_to_history(quiz, takers, ended_at)
+        _clear_live(taker_ids)
+    return archived
+
+
+def _copy_to_history(quiz, takers, ended_at):
+    # Step 2: write the copies to the default database, skipping takers a failed earlier attempt already archived
+    db = router.db_for_write(QuizHistory)
+    A = ArchivedResponse
+    with transaction.atomic(using=db):
+        done = set(
+            QuizHistory.objects.filter(quiz=quiz, source_taker_id__in=[t[0] for t in takers])
+            .values_list('source_taker_id', flat=True)
+        )
+        records = QuizHistory.objects.bulk_create([
+            QuizHistory(quiz=quiz, player_name=alias, score=score, completed_at=ended_at, source_taker_id=taker_id)
+            for taker_id, alias, score in takers
+            if taker_id not in done
+        ])
+
+        if records:
+            history_ids = {record.source_taker_id: record.id for record in records}
+            analytics.record_session(quiz, len(records), taker_ids=list(history_ids))
+
+            # Answers to questions or choices deleted during the session have nothing left to point at
+            key = get_answer_key(quiz)
+            answers = [
+                (history_ids[taker_id], question_id,
+                 choice_id if choice_id in key.questions[question_id].choice_ids else None)
+                for taker_id, question_id, choice_id in UserResponse.objects.filter(
+                    quiz_taker_id__in=list(history_ids)
+                ).values_list('quiz_taker_id', 'question_id', 'selected_choice_id').iterator()
+                if question_id in key.questions
+            ]
+            # One prepared INSERT for every answer; building model instances would cost more than the writes
+            with connections[db].cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {_table(A)} ({_column(A, 'history')}, {_column(A, 'question')}, {_column(A, 'selected_choice')})"
+                    f" VALUES (%s, %s, %s)",
+                    answers,
+                )
+
+        quiz.last_session_size = len(takers)
+        quiz.save()
+    return len(records)
+
+
+def _clear_live(taker_ids):
+    # Step 3: runs in the live transaction opened by _archive_across_databases
+    UserResponse.objects.filter(quiz_taker_id__in=taker_ids).delete()
+    QuizTaker.objects.filter(id__in=taker_ids).delete()
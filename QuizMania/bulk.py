@@ -0,0 +1,170 @@
+from django.db import transaction, IntegrityError
+
+from .models import Quiz, Question, Choice, generate_unique_code, CODE_COLLISION_RETRIES
+
+
+def parse_quiz_form(data):
+    """
+    Reads the dynamically numbered question fields posted by
+    start_session.html / review_quiz.html into a list of question dicts:
+    {'text', 'marks', 'duration', 'explanation', 'choices': [(text, is_correct), ...]}
+    """
+    # Extract unique question IDs from the keys
+    question_ids = set()
+    for key in data:
+        if key.startswith('question_text_'):
+            try:
+                question_ids.add(int(key.split('_')[-1]))
+            except (ValueError, IndexError):
+                continue
+
+    questions = []
+    for q_id in sorted(question_ids):
+        try:
+            marks = int(data.get(f'marks_{q_id}', 10))
+            duration = int(data.get(f'duration_{q_id}', 5))
+        except (ValueError, TypeError):
+            marks = 10
+            duration = 5
+
+        choices = []
+        for i in range(1, 5): # Assuming 4 options
+            option_text = data.get(f'option_{i}_{q_id}')
+            if option_text and option_text.strip():
+                choices.append((option_text, data.get(f'correct_option_{q_id}') == str(i)))
+
+        questions.append({
+            'text': data.get(f'question_text_{q_id}'),
+            'marks': marks,
+            'duration': duration,
+            'explanation': data.get(f'answer_{q_id}', ''), # Use 'answer' field as explanation
+            'choices': choices,
+        })
+    return questions
+
+
+def export_quiz(quiz):
+    """
+    Serialises a quiz (with questions and choices prefetched) to the dict
+    written by the export_quizzes command, one JSON object per line.
+    """
+    return {
+        'title': quiz.title,
+        'owner': quiz.owner.username,
+        'code': quiz.code,
+        'questions': [
+            {
+                'text': question.text,
+                'marks': question.marks,
+                'duration': question.duration,
+                'explanation': question.explanation or '',
+                'choices': [
+                    {'text': choice.text, 'is_correct': choice.is_correct}
+                    for choice in question.choices.all()
+                ],
+            }
+            for question in quiz.questions.all()
+        ],
+    }
+
+
+def parse_quiz_entry(data):
+    """
+    Validates one exported quiz dict and returns its questions in the same
+    shape as parse_quiz_form. Raises ValueError if the entry is malformed.
+    """
+    if not isinstance(data, dict) or not data.get('title'):
+        raise ValueError("entry needs a 'title'")
+    questions = []
+    for q in data.get('questions', []):
+        if not q.get('text'):
+            raise ValueError("every question needs a 'text'")
+        questions.append({
+            'text': q['text'],
+            'marks': int(q.get('marks', 10)),
+            'duration': int(q.get('duration', 5)),
+            'explanation': q.get('explanation') or '',
+            'choices': [(c['text'], bool(c.get('is_correct'))) for c in q.get('choices', [])],
+        })
+    return questions
+
+
+def _create_questions(entries, batch_size=None):
+    # entries: [(quiz, [question dict, ...]), ...] for quizzes that already have ids
+    created = Question.objects.bulk_create(
+        [
+            Question(
+                quiz_id=quiz.id,
+                text=q['text'],
+                marks=q['marks'],
+                duration=q['duration'],
+                explanation=q.get('explanation', ''),
+            )
+            for quiz, questions in entries
+            for q in questions
+        ],
+        batch_size=batch_size,
+    )
+    if created and created[0].pk is None:
+        # Backends that cannot return ids from a bulk insert: read them back in insertion order
+        quiz_ids = [quiz.id for quiz, _ in entries]
+        created = list(Question.objects.filter(quiz_id__in=quiz_ids).order_by('id'))[-len(created):]
+
+    all_questions = [q for _, questions in entries for q in questions]
+    Choice.objects.bulk_create(
+        [
+            Choice(question_id=question.id, text=text, is_correct=is_correct)
+            for question, q in zip(created, all_questions)
+            for text, is_correct in q['choices']
+        ],
+        batch_size=batch_size,
+    )
+    return created
+
+
+def create_questions(quiz, questions, batch_size=None):
+    """
+    Inserts questions and their choices for an existing quiz with one bulk
+    insert per table (split into batches of ``batch_size`` rows if given).
+    """
+    return _create_questions([(quiz, questions)], batch_size)
+
+
+def create_quiz(owner, title, questions):
+    """
+    Creates a quiz with all its questions and choices as a single atomic
+    operation: either the whole quiz exists afterwards or none of it does.
+    """
+    with transaction.atomic():
+        quiz = Quiz.objects.create(title=title, owner=owner)
+        create_questions(quiz, questions)
+    return quiz
+
+
+def create_quizzes(entries, batch_size=None):
+    """
+    Bulk counterpart of create_quiz for imports: ``entries`` is a list of
+    (owner, title, questions) and all of them are created in one
+    transaction with one bulk insert per table. Returns the new quizzes.
+    """
+    with transaction.atomic():
+        quizzes = [Quiz(owner=owner, title=title) for owner, title, _ in entries]
+        for attempt in range(CODE_COLLISION_RETRIES):
+            try:
+                with transaction.atomic():
+                    quizzes = Quiz.objects.bulk_create(quizzes, batch_size=batch_size)
+                break
+            except IntegrityError:
+                # bulk_create skips Quiz.save(); redraw codes that hit an existing quiz
+                taken = set(Quiz.objects.filter(code__in=[q.code for q in quizzes]).values_list('code', flat=True))
+                if attempt == CODE_COLLISION_RETRIES - 1 or not taken:
+                    raise
+                for quiz in quizzes:
+                    if quiz.code in taken:
+                        quiz.code = generate_unique_code()
+        if quizzes and quizzes[0].pk is None:
+            codes = {quiz.code: quiz for quiz in quizzes}
+            for quiz_id, code in Quiz.objects.filter(code__in=codes).values_list('id', 'code'):
+                codes[code].id = quiz_id
+        _create_questions([(quiz, questions) for quiz, (_, _, questions) in zip(quizzes, entries)], batch_size)
+    return quizzes
@@ -0,0 +1,148 @@
+import hashlib
+import string
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import router, transaction
+
+# Quiz codes are 6 characters from A-Z0-9. Instead of drawing random codes
+# and checking each one against the table, codes are handed out from a
+# sequence: index n of the sequence is pushed through a keyed permutation of
+# the whole code space, so consecutive indexes give unrelated-looking codes
+# and no two indexes ever give the same code.
+#
+# Indexes are reserved in blocks: inserting one QuizCodeBlock row (an
+# auto-increment id the database hands out atomically) reserves
+# CODE_BLOCK_SIZE indexes, so allocating a code costs no query at all most of
+# the time and never needs an existence check. Each thread draws from its own
+# block.
+#
+# Quiz codes are usually drawn inside the caller's transaction (the Quiz.code
+# default runs when a Quiz is built), so the reservation is part of it. If
+# that transaction rolls back, SQLite hands the same id out again and another
+# process would draw the same indexes. A block reserved in a transaction is
+# therefore provisional until the transaction commits (its on_commit hook
+# runs): before each code drawn from it, the allocator checks that its row,
+# identified by the random token written with it, is still there. After a
+# rollback, of the transaction or of a savepoint around the reservation, the
+# row is gone (or the id belongs to another reservation) and a new block is
+# reserved. Outside a transaction on_commit runs at once, so blocks reserved
+# in autocommit never need the check.
+
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 6
+CODE_SPACE = len(CODE_ALPHABET) ** CODE_LENGTH
+CODE_BLOCK_SIZE = 100
+
+FEISTEL_ROUNDS = 4
+HALF_BITS = 16
+HALF_MASK = (1 << HALF_BITS) - 1
+
+
+class CodeSpaceExhausted(Exception):
+    pass
+
+
+def _permutation_key():
+    # Derived from SECRET_KEY so codes cannot be predicted from the sequence
+    return hashlib.sha256(f"QuizMania.codes:{settings.SECRET_KEY}".encode()).digest()
+
+
+def _round_value(key, round_no, half):
+    digest = hashlib.blake2b(bytes([round_no]) + half.to_bytes(2, 'big'), key=key, digest_size=2).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def permute(index, key=None):
+    """
+    Maps a sequence index in [0, CODE_SPACE) to a unique position in the
+    same range: a balanced Feistel network over 32 bits, repeated
+    ("cycle walking") until the result falls back inside the code space.
+    """
+    key = key or _permutation_key()
+    value = index
+    while True:
+        left, right = value >> HALF_BITS, value & HALF_MASK
+        for round_no in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ _round_value(key, round_no, right)
+        value = (left << HALF_BITS) | right
+        if value < CODE_SPACE:
+            return value
+
+
+def encode(position):
+    chars = []
+    for _ in range(CODE_LENGTH):
+        position, digit = divmod(position, len(CODE_ALPHABET))
+        chars.append(CODE_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class _Block:
+
+    def __init__(self, block_id, token, start, end, alias):
+        self.id = block_id
+        self.token = token
+        self.next = start
+        self.end = end
+        self.alias = alias
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+
+    def usable(self):
+        from .models import QuizCodeBlock
+        if self.next >= self.end:
+            return False
+        if self.committed:
+            return True
+        # Provisional: only visible while the transaction that reserved it is open
+        return QuizCodeBlock.objects.using(self.alias).filter(id=self.id, token=self.token).exists()
+
+
+class CodeAllocator:
+
+    def __init__(self, block_size=CODE_BLOCK_SIZE):
+        self.block_size = block_size
+        self._key = None
+        self._local = threading.local()
+
+    def _reserve_block(self):
+        from .models import QuizCodeBlock
+        alias = router.db_for_write(QuizCodeBlock)
+        block = QuizCodeBlock.objects.create(token=uuid.uuid4())
+        start = (block.id - 1) * self.block_size
+        if start >= CODE_SPACE:
+            raise CodeSpaceExhausted("All quiz codes have been allocated")
+        reserved = _Block(block.id, block.token, start, min(start + self.block_size, CODE_SPACE), alias)
+        transaction.on_commit(reserved.commit, using=alias)
+        return reserved
+
+    def allocate(self):
+        block = getattr(self._local, 'block', None)
+        if block is None or not block.usable():
+            block = self._local.block = self._reserve_block()
+        index = block.next
+        block.next += 1
+        if self._key is None:
+            self._key = _permutation_key()
+        return encode(permute(index, self._key))
+
+    def discard_block(self):
+        """
+        Drops this thread's block, so the next code comes from a new one.
+        """
+        self._local.block = None
+
+
+_allocator = CodeAllocator()
+
+
+def allocate_code():
+    return _allocator.allocate()
+
+
+def discard_block():
+    _allocator.discard_block()
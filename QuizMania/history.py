@@ -0,0 +1,64 @@
+from django.db.models import Avg, Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+from .models import HistoryRollup, QuizHistory
+
+# Summary statistics for the quiz history page, computed in the database so
+# the page never loads every record of a long-running quiz.
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _nearest_rank(percentile, attempts):
+    # 1-based position of a percentile in a list of ``attempts`` sorted scores
+    return max(1, -(-percentile * attempts // 100))
+
+
+def history_stats(quiz):
+    """
+    Attempts, mean, min/max, median, percentiles and top scorer of a quiz's
+    history, in four queries whatever the number of records.
+    """
+    records = QuizHistory.objects.filter(quiz=quiz)
+    # Score aggregates read only the (quiz, score) index, the session count only (quiz, completed_at)
+    stats = records.aggregate(attempts=Count('*'), mean=Avg('score'), lowest=Min('score'), highest=Max('score'))
+    stats['sessions'] = records.values('completed_at').distinct().count()
+    attempts = stats['attempts']
+    stats['percentiles'] = {}
+    stats['median'] = stats['top_scorer'] = None
+    if not attempts:
+        return stats
+
+    # Scores at the wanted ranks, picked with one window query over the (quiz, score) index
+    ranks = {p: _nearest_rank(p, attempts) for p in PERCENTILES}
+    middle = {(attempts + 1) // 2, attempts // 2 + 1}
+    at_rank = dict(
+        records.annotate(rank=Window(RowNumber(), order_by=[F('score').asc(), F('id').asc()]))
+        .filter(rank__in=set(ranks.values()) | middle)
+        .values_list('rank', 'score')
+    )
+    stats['percentiles'] = {p: at_rank[rank] for p, rank in ranks.items()}
+    stats['median'] = sum(at_rank[rank] for rank in middle) / len(middle)
+
+    # Earliest record with the best score wins ties
+    stats['top_scorer'] = records.order_by('-score', 'completed_at', 'id').values('player_name', 'score', 'completed_at').first()
+    return stats
+
+
+def session_summaries(quiz, limit=None):
+    """
+    One row per archived session (records sharing a completed_at), newest
+    first: players, mean, best and lowest score.
+    """
+    sessions = (
+        QuizHistory.objects.filter(quiz=quiz)
+        .values('completed_at')
+        .annotate(players=Count('id'), mean=Avg('score'), best=Max('score'), lowest=Min('score'))
+        .order_by('-completed_at')
+    )
+    return list(sessions[:limit] if limit else sessions)
+
+
+def history_rollups(quiz):
+    # Totals of records compacted away by the compact_history command, newest period first
+    return list(HistoryRollup.objects.filter(quiz=quiz).order_by('-period_start', 'period'))
@@ -0,0 +1,293 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from .models import QuizTaker, UserResponse
+from .scoring import grade_submission, invalidate_reviews
+
+logger = logging.getLogger(__name__)
+
+# Write-behind ingestion of quiz submissions (opt-in, QUIZMANIA_WRITE_BEHIND).
+#
+# A submission is graded in memory, appended to a local journal and fsynced,
+# and acknowledged straight away. A background thread then writes the
+# buffered UserResponse rows and scores to the database in one transaction
+# per flush, so a burst of submits takes the SQLite write lock once per
+# flush instead of once per student.
+#
+# Each process journals into its own subdirectory of QUIZMANIA_JOURNAL_DIR,
+# holding an exclusive lock on the LOCK_NAME file in it for as long as it
+# runs. The subdirectory holds numbered segment files. Each flush closes the
+# current segment and starts a new one; segments are only deleted after the
+# batch they hold has been committed, and a process only ever deletes its own.
+#
+# On startup a process adopts every other subdirectory whose lock it can take,
+# i.e. whose owner has exited, replays its segments (newest submission per
+# taker wins) and removes it once they are committed. Journals of processes
+# still running are left alone, so nothing acknowledged is lost to a crash
+# and nothing is written twice by a restart that overlaps the old process.
+
+SEGMENT_SUFFIX = '.jsonl'
+LOCK_NAME = 'lock'
+
+
+def _try_lock(path):
+    # Returns the open lock file, or None if another process holds the lock
+    lock = open(path, 'a+b')
+    try:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def enabled():
+    return getattr(settings, 'QUIZMANIA_WRITE_BEHIND', False)
+
+
+class SubmissionBuffer:
+
+    def __init__(self, journal_dir, flush_interval=1.0, flush_batch=500):
+        self.root = Path(journal_dir)
+        self.journal_dir = self.root / f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._pending = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        # Journals of exited processes, removed once their entries are committed
+        self._adopted = []
+
+        self.journal_dir.mkdir(parents=True)
+        self._lock_file = _try_lock(self.journal_dir / LOCK_NAME)
+        self._segment_no = 1
+        self._segment = self._open_segment()
+
+    # --- Journal -------------------------------------------------------
+
+    def _segments(self, directory=None):
+        directory = directory or self.journal_dir
+        return sorted(directory.glob(f'*{SEGMENT_SUFFIX}'), key=lambda p: int(p.stem))
+
+    def _open_segment(self):
+        path = self.journal_dir / f'{self._segment_no:08d}{SEGMENT_SUFFIX}'
+        return open(path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        # Called with self._lock held
+        self._segment.close()
+        self._segment_no += 1
+        self._segment = self._open_segment()
+        return self._segment_no
+
+    def recover(self):
+        """
+        Replays the journals left behind by processes that have exited and
+        flushes them. Returns the number of submissions recovered.
+        """
+        recovered = {}
+        adopted = []
+        for directory in sorted(self.root.iterdir()):
+            if not directory.is_dir() or directory == self.journal_dir:
+                continue
+            lock = _try_lock(directory / LOCK_NAME)
+            if lock is None:
+                # Its process is still running and flushes its own journal
+                continue
+            adopted.append((directory, lock))
+            for path in self._segments(directory):
+                with open(path, encoding='utf-8') as segment:
+                    for line in segment:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Torn write from a crash mid-append; it was never acknowledged
+                            continue
+                        recovered[entry['taker']] = entry
+        if adopted:
+            with self._lock:
+                for taker_id, entry in recovered.items():
+                    self._pending.setdefault(taker_id, entry)
+                self._adopted.extend(adopted)
+            self.flush()
+            logger.info(f"Recovered {len(recovered)} buffered submissions from {len(adopted)} journal(s) in {self.root}")
+        return len(recovered)
+
+    # --- Ingestion -----------------------------------------------------
+
+    def submit(self, quiz_taker, score, responses):
+        """
+        Journals a graded submission and queues it for the next flush.
+        Returns once the journal entry is on disk.
+        """
+        entry = {
+            'taker': quiz_taker.id,
+            'score': score,
+            'responses': [list(pair) for pair in responses],
+        }
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self._segment.write(line)
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._pending[quiz_taker.id] = entry
+            pending = len(self._pending)
+        self._start()
+        if pending >= self.flush_batch:
+            self._wakeup.set()
+
+    def has_pending(self, taker_id):
+        # Includes a batch that is being written right now
+        return taker_id in self._pending or taker_id in self._inflight
+
+    # --- Flushing ------------------------------------------------------
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='quizmania-flusher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed; will retry")
+            finally:
+                connections.close_all()
+
+    def flush(self):
+        """
+        Writes every buffered submission to the database in one transaction.
+        Safe to call from any thread; returns the number of takers written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending and not self._adopted:
+                    return 0
+                batch = self._inflight = self._pending
+                adopted, self._adopted = self._adopted, []
+                self._pending = {}
+                first_live_segment = self._rotate()
+
+            try:
+                self._write(batch)
+            except Exception:
+                # Put the batch back unless the taker submitted again meanwhile
+                with self._lock:
+                    for taker_id, entry in batch.items():
+                        self._pending.setdefault(taker_id, entry)
+                    self._adopted[:0] = adopted
+                raise
+            finally:
+                self._inflight = {}
+
+            for path in self._segments():
+                if int(path.stem) < first_live_segment:
+                    path.unlink()
+            for directory, lock in adopted:
+                # Segments first, while still locked; Windows cannot remove the open lock file
+                for path in self._segments(directory):
+                    path.unlink()
+                lock.close()
+                shutil.rmtree(directory, ignore_errors=True)
+            return len(batch)
+
+    def _write(self, batch):
+        with transaction.atomic(using=router.db_for_write(UserResponse)):
+            # Takers removed since they submitted (session ended, quiz deleted) are dropped
+            live_ids = set(QuizTaker.objects.filter(id__in=batch.keys()).values_list('id', flat=True))
+            UserResponse.objects.filter(quiz_taker_id__in=live_ids).delete()
+            UserResponse.objects.bulk_create(
+                [
+                    UserResponse(quiz_taker_id=taker_id, question_id=question_id, selected_choice_id=choice_id)
+                    for taker_id in live_ids
+                    for question_id, choice_id in batch[taker_id]['responses']
+                ],
+                batch_size=self.flush_batch,
+            )
+            QuizTaker.objects.bulk_update(
+                [QuizTaker(id=taker_id, score=batch[taker_id]['score']) for taker_id in live_ids],
+                ['score'],
+                batch_size=self.flush_batch,
+            )
+            invalidate_reviews(live_ids)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    Returns the process-wide SubmissionBuffer, replaying any journal left by
+    a previous run the first time it is created.
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                buffer = SubmissionBuffer(
+                    settings.QUIZMANIA_JOURNAL_DIR,
+                    flush_interval=getattr(settings, 'QUIZMANIA_FLUSH_INTERVAL', 1.0),
+                    flush_batch=getattr(settings, 'QUIZMANIA_FLUSH_BATCH', 500),
+                )
+                buffer.recover()
+                _buffer = buffer
+    return _buffer
+
+
+def submit(quiz, quiz_taker, answers):
+    """
+    Write-behind counterpart of scoring.score_submission: grades in memory,
+    journals, and leaves the database writes to the flusher. Sets and
+    returns the taker's new score.
+    """
+    score, responses = grade_submission(quiz, answers)
+    get_buffer().submit(quiz_taker, score, responses)
+    quiz_taker.score = score
+    return score
+
+
+def flush():
+    """
+    Synchronously persists everything buffered. Views that read responses or
+    archive takers call this first; a no-op when write-behind is off.
+    """
+    if enabled():
+        get_buffer().flush()
+
+
+def flush_taker(taker_id):
+    """
+    Like flush(), but only does work if this taker has something buffered.
+    Returns True if a flush happened.
+    """
+    if enabled() and get_buffer().has_pending(taker_id):
+        get_buffer().flush()
+        return True
+    return False
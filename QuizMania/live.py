@@ -0,0 +1,394 @@
+import asyncio
+import bisect
+import itertools
+import json
+import threading
+import time
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+
+from .models import Quiz, QuizTaker
+
+# Event stream tuning (seconds). Version checks and snapshots are in-memory,
+# so polling them every second costs nothing; the stream ends after
+# STREAM_MAX_AGE and the browser's EventSource reconnects on its own.
+STREAM_CHECK_INTERVAL = 1
+STREAM_HEARTBEAT = 15
+STREAM_MAX_AGE = 300
+STREAM_RETRY_MS = 3000
+
+# Per-quiz change counters. Views call publish() whenever the QuizTaker rows
+# of a quiz change, so the event stream and the ETags of the JSON endpoints
+# can tell "nothing new" apart from "something to send" without touching the
+# database. Counters start from the current time in milliseconds, so a
+# version handed out before a restart is never reused for different data.
+_versions = {}
+_versions_lock = threading.Lock()
+
+# Quizzes nobody has polled, joined or published for SESSION_IDLE_TIMEOUT
+# seconds lose their cached session and version (see _sweep), so memory is
+# bounded by the quizzes in use rather than every quiz ever seen. A version
+# recreated afterwards starts from the current time again, which is past
+# anything handed out before the quiz went idle.
+SESSION_IDLE_TIMEOUT = 3600
+SWEEP_INTERVAL = 60
+_last_used = {}
+_last_sweep = 0.0
+
+
+def _initial_version():
+    return int(time.time() * 1000)
+
+
+def publish(quiz_code):
+    """
+    Marks the live state of a quiz as changed and returns the new version.
+    """
+    with _versions_lock:
+        version = _versions.get(quiz_code, _initial_version()) + 1
+        _versions[quiz_code] = version
+        _last_used[quiz_code] = time.monotonic()
+    return version
+
+
+def current_version(quiz_code):
+    """
+    Returns the live version of a quiz, or None if it has not been loaded
+    or changed since this process started.
+    """
+    return _versions.get(quiz_code)
+
+
+def etag(request, quiz_code):
+    """
+    ETag for the live JSON endpoints (used with django's @condition).
+    """
+    if get_session(quiz_code) is None:
+        return None
+    return str(current_version(quiz_code))
+
+
+RankedTaker = namedtuple('RankedTaker', ['id', 'alias', 'score'])
+
+
+class LiveSession:
+    """
+    In-memory view of one quiz's active session: who joined (in join order)
+    and their current scores. The database stays the source of truth; this
+    is rebuilt from QuizTaker rows whenever it is missing (e.g. after a restart).
+
+    Every entry remembers the version at which it last changed, and takers
+    removed by end_session() leave a tombstone, so delta() can answer
+    "what changed since version N" without resending the whole board.
+
+    The leaderboard is kept as a sorted list of (-score, taker id) keys. A
+    saved score finds its old and new position by binary search (O(log N))
+    and moves the key with a list shift (O(N), a memmove of pointers), so
+    top(k) never sorts. Ties go to whoever joined first.
+    """
+
+    def __init__(self, quiz_id, quiz_code, owner_id, version):
+        self.quiz_id = quiz_id
+        self.quiz_code = quiz_code
+        self.owner_id = owner_id
+        self._takers = {}
+        self._tombstones = {}
+        self._ranking = []
+        # Oldest cursor delta() can still answer; older ones get a full resync
+        self._horizon = version
+        self._last_clear = version
+        self._lock = threading.Lock()
+        # Set once load() has merged the QuizTaker rows (see get_session)
+        self._loaded = threading.Event()
+        self._failed = False
+
+    def load(self, takers):
+        """
+        Merges the quiz's QuizTaker rows, read after this session was
+        registered, with whatever set_taker() recorded meanwhile (which is
+        newer and wins). If the session was ended meanwhile, the rows are
+        already archived and skipped.
+        """
+        with self._lock:
+            if self._last_clear == self._horizon:
+                version = publish(self.quiz_code)
+                merged = {taker_id: (alias, score, version) for taker_id, alias, score in takers}
+                merged.update(self._takers)
+                # Join order is id order
+                self._takers = dict(sorted(merged.items()))
+                self._ranking = sorted((-score, taker_id) for taker_id, (_, score, _) in self._takers.items())
+        self._loaded.set()
+
+    def fail(self):
+        self._failed = True
+        self._loaded.set()
+
+    def wait_loaded(self):
+        """
+        Blocks until the session is loaded; False if loading it failed.
+        """
+        self._loaded.wait()
+        return not self._failed
+
+    @property
+    def count(self):
+        return len(self._takers)
+
+    def set_taker(self, taker_id, alias, score):
+        with self._lock:
+            version = publish(self.quiz_code)
+            previous = self._takers.get(taker_id)
+            if previous is not None:
+                del self._ranking[bisect.bisect_left(self._ranking, (-previous[1], taker_id))]
+            bisect.insort(self._ranking, (-score, taker_id))
+            self._takers[taker_id] = (alias, score, version)
+            self._tombstones.pop(taker_id, None)
+
+    def clear(self):
+        with self._lock:
+            version = publish(self.quiz_code)
+            # Tombstones from the previous clear are dropped, so cursors from
+            # before it can no longer be answered incrementally.
+            self._horizon = self._last_clear
+            self._last_clear = version
+            self._tombstones = {taker_id: version for taker_id in self._takers}
+            self._takers.clear()
+            self._ranking = []
+
+    def _entries(self):
+        with self._lock:
+            return [(taker_id, alias, score) for taker_id, (alias, score, _) in self._takers.items()]
+
+    def top(self, k=None):
+        """
+        Returns the k best takers (all of them if k is None), best first.
+        """
+        with self._lock:
+            keys = self._ranking if k is None else self._ranking[:k]
+            return [RankedTaker(taker_id, self._takers[taker_id][0], -neg_score) for neg_score, taker_id in keys]
+
+    def roster(self):
+        return [{'username': alias} for _, alias, _ in self._entries()]
+
+    def scoreboard(self):
+        return [{'username': taker.alias, 'score': taker.score} for taker in self.top()]
+
+    def snapshot(self, limit=None):
+        """
+        Count, roster (join order) and ranked scoreboard read under one lock,
+        so all three describe the same moment. With ``limit`` the roster and
+        scoreboard are cut to their first ``limit`` entries.
+        """
+        with self._lock:
+            version = current_version(self.quiz_code)
+            roster = list(self._takers.items()) if limit is None else list(itertools.islice(self._takers.items(), limit))
+            ranking = self._ranking if limit is None else self._ranking[:limit]
+            scoreboard = [(self._takers[taker_id][0], -neg_score) for neg_score, taker_id in ranking]
+            count = len(self._takers)
+        return {
+            'version': version,
+            'live_count': count,
+            'participants': [{'username': alias} for _, (alias, _, _) in roster],
+            'scoreboard': [{'username': alias, 'score': score} for alias, score in scoreboard],
+            'truncated': limit is not None and count > limit,
+        }
+
+    def delta(self, since=None):
+        """
+        Returns the takers that joined or changed score after version
+        ``since`` plus the ids of takers removed since then. Without a
+        cursor, or with one older than this session can answer, every taker
+        is returned with ``full`` set so the client starts over.
+        """
+        with self._lock:
+            version = current_version(self.quiz_code)
+            full = since is None or since < self._horizon
+            if full:
+                changed = list(self._takers.items())
+                removed = []
+            else:
+                changed = [(taker_id, entry) for taker_id, entry in self._takers.items() if entry[2] > since]
+                removed = [taker_id for taker_id, removed_at in self._tombstones.items() if removed_at > since]
+            count = len(self._takers)
+        return {
+            'version': version,
+            'full': full,
+            'live_count': count,
+            'changed': [{'id': taker_id, 'username': alias, 'score': score} for taker_id, (alias, score, _) in changed],
+            'removed': removed,
+        }
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _sweep():
+    # Drops the sessions and versions of quizzes idle for SESSION_IDLE_TIMEOUT, at most once per SWEEP_INTERVAL
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    with _sessions_lock, _versions_lock:
+        for quiz_code, used in list(_last_used.items()):
+            if now - used > SESSION_IDLE_TIMEOUT:
+                _sessions.pop(quiz_code, None)
+                _versions.pop(quiz_code, None)
+                del _last_used[quiz_code]
+
+
+def _register_session(quiz_code):
+    quiz = Quiz.objects.filter(code=quiz_code).values('id', 'owner_id').first()
+    if quiz is None:
+        # Unknown codes (404 probes) leave nothing behind
+        return None
+    with _sessions_lock:
+        session = _sessions.get(quiz_code)
+        if session is not None:
+            # Registered by another thread, which loads it
+            return session
+        with _versions_lock:
+            version = _versions.setdefault(quiz_code, _initial_version())
+            _last_used[quiz_code] = time.monotonic()
+        session = _sessions[quiz_code] = LiveSession(quiz['id'], quiz_code, quiz['owner_id'], version)
+
+    # From here on record_taker() and end_session() find the session and apply
+    # their changes to it, and anything committed before is in the rows read
+    # below, so one read is enough however many joins land meanwhile.
+    try:
+        takers = list(QuizTaker.objects.filter(quiz_id=quiz['id']).values_list('id', 'alias', 'score'))
+    except BaseException:
+        with _sessions_lock:
+            if _sessions.get(quiz_code) is session:
+                del _sessions[quiz_code]
+        session.fail()
+        raise
+    session.load(takers)
+    return session
+
+
+def get_session(quiz_code):
+    """
+    Returns the LiveSession for a quiz code, loading it from the database on
+    first use. Returns None if no such quiz exists.
+    """
+    _sweep()
+    while True:
+        session = _sessions.get(quiz_code)
+        if session is None:
+            session = _register_session(quiz_code)
+            if session is None:
+                return None
+        # A session another thread failed to load is gone from _sessions; try again
+        if session.wait_loaded():
+            _last_used[quiz_code] = time.monotonic()
+            return session
+
+
+def get_session_or_404(quiz_code):
+    session = get_session(quiz_code)
+    if session is None:
+        raise Http404("Quiz not found")
+    return session
+
+
+def record_taker(quiz_code, taker):
+    """
+    Called after a QuizTaker row is created or its score saved.
+    """
+    with _sessions_lock:
+        session = _sessions.get(quiz_code)
+        if session is None:
+            # Nothing cached to update; pollers and streams still see the version move
+            publish(quiz_code)
+            return
+    session.set_taker(taker.id, taker.alias, taker.score)
+
+
+def end_session(quiz_code):
+    """
+    Called after a quiz's QuizTaker rows have been archived and deleted.
+    """
+    with _sessions_lock:
+        session = _sessions.get(quiz_code)
+        if session is None:
+            publish(quiz_code)
+            return
+    session.clear()
+
+
+def forget(quiz_code):
+    """
+    Drops the cached session of a deleted quiz.
+    """
+    with _sessions_lock, _versions_lock:
+        _sessions.pop(quiz_code, None)
+        # Streams notice the version is gone and stop (see event_stream)
+        _versions.pop(quiz_code, None)
+        _last_used.pop(quiz_code, None)
+
+
+def parse_version(value):
+    """
+    Parses a client-supplied version cursor; anything invalid means "none".
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_limit(value):
+    """
+    Parses a client-supplied ?limit=N; anything invalid or below 1 means "no limit".
+    """
+    limit = parse_version(value)
+    if limit is None or limit < 1:
+        return None
+    return limit
+
+
+def format_event(event, data, event_id=None):
+    """
+    Serializes one Server-Sent Events message.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(session, since=None):
+    """
+    Yields an 'update' event carrying a delta (see LiveSession.delta)
+    whenever the quiz's version changes, and a comment line as keep-alive
+    in between. The first event resumes from ``since`` (the browser's
+    Last-Event-ID on reconnect) or is a full resync.
+    """
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    sent_version = since
+    first = True
+
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    while loop.time() - started < STREAM_MAX_AGE:
+        if first or current_version(session.quiz_code) != sent_version:
+            first = False
+            if _sessions.get(session.quiz_code) is not session:
+                # Evicted while idle, or the quiz was deleted: follow the current session
+                session = await sync_to_async(get_session)(session.quiz_code)
+                if session is None:
+                    return
+            data = session.delta(sent_version)
+            yield format_event('update', data, event_id=data['version'])
+            sent_version = data['version']
+            last_sent = loop.time()
+        elif loop.time() - last_sent >= STREAM_HEARTBEAT:
+            yield ": keep-alive\n\n"
+            last_sent = loop.time()
+        await asyncio.sleep(STREAM_CHECK_INTERVAL)
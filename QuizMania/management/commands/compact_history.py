@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from QuizMania.retention import PERIODS, compact_history, expired_history, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = ("Rolls quiz history older than the retention window up into per-quiz, per-period totals and deletes "
+            "the raw records in small batches, pausing between batches so live sessions are not stalled.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help=f"keep records from the last DAYS days (default: QUIZMANIA_HISTORY_RETENTION_DAYS, "
+                                 f"{settings.QUIZMANIA_HISTORY_RETENTION_DAYS})")
+        parser.add_argument('--period', choices=sorted(PERIODS),
+                            help=f"length of a rollup period (default: QUIZMANIA_HISTORY_ROLLUP_PERIOD, "
+                                 f"{settings.QUIZMANIA_HISTORY_ROLLUP_PERIOD})")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="records per transaction; a batch is extended to the end of its last session")
+        parser.add_argument('--pause', type=float, default=0.05, help="seconds to sleep between batches")
+        parser.add_argument('--dry-run', action='store_true', help="only report how many records would be compacted")
+
+    def handle(self, *args, **options):
+        period = options['period'] or settings.QUIZMANIA_HISTORY_ROLLUP_PERIOD
+        if period not in PERIODS:
+            raise CommandError(f"Unknown rollup period {period!r} (choose from {', '.join(sorted(PERIODS))})")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        cutoff = retention_cutoff(options['days'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired_history(cutoff).count()} records completed before {cutoff:%Y-%m-%d %H:%M} "
+                              f"would be compacted into {period} rollups")
+            return
+
+        self.started = time.perf_counter()
+        self.longest = 0
+        compacted = compact_history(cutoff, period, options['batch_size'], options['pause'], self._progress)
+
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted {compacted} records completed before {cutoff:%Y-%m-%d %H:%M} into {period} rollups "
+            f"in {elapsed:.1f}s ({compacted / elapsed:.0f} records/s, longest transaction {self.longest * 1000:.0f} ms)"
+        ))
+
+    def _progress(self, compacted, held):
+        self.longest = max(self.longest, held)
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        self.stderr.write(f"Compacting... {compacted} records ({compacted / elapsed:.0f} records/s)")
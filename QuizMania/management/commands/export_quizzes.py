@@ -0,0 +1,61 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+
+from QuizMania.bulk import export_quiz
+from QuizMania.models import Quiz, Question, Choice
+
+
+class Command(BaseCommand):
+    help = "Exports quizzes with their questions and choices as JSON Lines (one quiz per line)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help="file to write, '-' for stdout (default)")
+        parser.add_argument('--owner', help="only export quizzes owned by this username")
+        parser.add_argument('--batch-size', type=int, default=500, help="quizzes fetched per query batch")
+
+    def handle(self, *args, **options):
+        quizzes = (
+            Quiz.objects.select_related('owner')
+            .prefetch_related(Prefetch(
+                'questions',
+                queryset=Question.objects.order_by('id').prefetch_related(
+                    Prefetch('choices', queryset=Choice.objects.order_by('id'))
+                ),
+            ))
+            .order_by('id')
+        )
+        if options['owner']:
+            quizzes = quizzes.filter(owner__username=options['owner'])
+
+        # Progress goes to stderr so stdout can carry the export itself
+        log = sys.stderr if options['output'] == '-' else self.stdout
+        try:
+            out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['output']}: {e}")
+
+        started = time.perf_counter()
+        exported = questions = 0
+        try:
+            # iterator() keeps memory bounded; prefetching is applied per chunk
+            for quiz in quizzes.iterator(chunk_size=options['batch_size']):
+                entry = export_quiz(quiz)
+                out.write(json.dumps(entry) + '\n')
+                exported += 1
+                questions += len(entry['questions'])
+                if exported % options['batch_size'] == 0:
+                    self._progress(log, exported, questions, started)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        self._progress(log, exported, questions, started, done=True)
+
+    def _progress(self, log, quizzes, questions, started, done=False):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        label = "Exported" if done else "Exporting..."
+        log.write(f"{label} {quizzes} quizzes, {questions} questions in {elapsed:.1f}s "
+                  f"({questions / elapsed:.0f} questions/s)\n")
@@ -0,0 +1,79 @@
+import json
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from QuizMania.bulk import create_quizzes, parse_quiz_entry
+
+
+class Command(BaseCommand):
+    help = ("Imports quizzes from JSON Lines as written by export_quizzes. Every quiz gets a new code; "
+            "quizzes are committed in batches, so an interrupted import keeps the batches already done.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-', help="file to read, '-' for stdin (default)")
+        parser.add_argument('--owner', help="username that owns every imported quiz (default: the 'owner' of each line)")
+        parser.add_argument('--batch-size', type=int, default=2000, help="questions inserted per transaction")
+
+    def handle(self, *args, **options):
+        self.owners = {}
+        if options['owner']:
+            self.default_owner = self._get_owner(options['owner'])
+        else:
+            self.default_owner = None
+
+        try:
+            source = sys.stdin if options['input'] == '-' else open(options['input'], encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['input']}: {e}")
+
+        self.started = time.perf_counter()
+        self.quizzes = self.questions = 0
+        batch, batch_questions = [], 0
+        try:
+            for line_no, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                    questions = parse_quiz_entry(data)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    raise CommandError(f"Line {line_no}: invalid quiz entry ({e})")
+                owner = self.default_owner or self._get_owner(data.get('owner'), line_no)
+
+                batch.append((owner, data['title'], questions))
+                batch_questions += len(questions)
+                if batch_questions >= options['batch_size']:
+                    self._flush(batch, batch_questions, options['batch_size'])
+                    batch, batch_questions = [], 0
+            self._flush(batch, batch_questions, options['batch_size'])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.quizzes} quizzes, {self.questions} questions in {elapsed:.1f}s "
+            f"({self.questions / elapsed:.0f} questions/s)"
+        ))
+
+    def _get_owner(self, username, line_no=None):
+        if username not in self.owners:
+            try:
+                self.owners[username] = User.objects.get(username=username)
+            except User.DoesNotExist:
+                where = f"Line {line_no}: " if line_no else ""
+                raise CommandError(f"{where}unknown owner {username!r} (use --owner to assign one)")
+        return self.owners[username]
+
+    def _flush(self, batch, batch_questions, batch_size):
+        if not batch:
+            return
+        create_quizzes(batch, batch_size=batch_size)
+        self.quizzes += len(batch)
+        self.questions += batch_questions
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        self.stderr.write(f"Importing... {self.quizzes} quizzes, {self.questions} questions "
+                          f"({self.questions / elapsed:.0f} questions/s)")
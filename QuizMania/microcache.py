@@ -0,0 +1,85 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+# Short-TTL caching of whole responses for endpoints every participant polls
+# with identical parameters (live scoreboard and count, the students' results
+# page). For QUIZMANIA_MICROCACHE_TIMEOUT seconds, all requests for the same
+# URL (and variant, see micro_cache) get the first one's response from the
+# shared cache, so a room refreshing at once renders and serializes it once
+# per interval instead of once per participant. Live data can therefore be up
+# to that many seconds old; the SSE stream is not cached.
+#
+# Hits and misses are counted per view in the cache itself, so with a shared
+# backend the counts cover every worker (see stats() and the cache_stats view;
+# the file backend restarts a count left idle for the cache's default timeout).
+# Responses also carry an X-Cache: HIT/MISS header.
+
+STATS_PREFIX = 'quizmania:micro-stats'
+_views = set()
+
+
+def _count(view_name, outcome):
+    key = f'{STATS_PREFIX}:{view_name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First count; a concurrent first count may be lost, which is fine for statistics
+        cache.add(key, 1, timeout=None)
+
+
+def micro_cache(variant=None):
+    """
+    Caches a view's 200 GET responses for QUIZMANIA_MICROCACHE_TIMEOUT
+    seconds, keyed by path and query string. ``variant(request, *args,
+    **kwargs)`` can split the cache further (its value is added to the key)
+    or return None to bypass it for that request.
+    """
+    def decorator(view):
+        _views.add(view.__name__)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.QUIZMANIA_MICROCACHE_TIMEOUT
+            extra = variant(request, *args, **kwargs) if variant else ''
+            if request.method not in ('GET', 'HEAD') or extra is None or not timeout:
+                return view(request, *args, **kwargs)
+
+            key = f'quizmania:micro:{view.__name__}:{request.get_full_path()}:{extra}'
+            cached = cache.get(key)
+            if cached is not None:
+                _count(view.__name__, 'hits')
+                content, headers = cached
+                # The cached body keeps the ETag it was served with, so revalidation stays consistent
+                etag = headers.get('ETag')
+                if etag and etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                    response = HttpResponseNotModified(headers={'ETag': etag})
+                else:
+                    response = HttpResponse(content, headers=headers)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _count(view.__name__, 'misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                headers = {h: response[h] for h in ('Content-Type', 'ETag') if response.has_header(h)}
+                cache.set(key, (response.content, headers), timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    """
+    Hits and misses per micro-cached view since the cache was last cleared.
+    """
+    keys = [f'{STATS_PREFIX}:{name}:{outcome}' for name in sorted(_views) for outcome in ('hits', 'misses')]
+    counts = cache.get_many(keys)
+    return {
+        name: {outcome: counts.get(f'{STATS_PREFIX}:{name}:{outcome}', 0) for outcome in ('hits', 'misses')}
+        for name in sorted(_views)
+    }
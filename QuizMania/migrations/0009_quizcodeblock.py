@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0008_alter_quiztaker_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizCodeBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0009_quizcodeblock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='last_session_size',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['owner', 'updated_at'], name='quiz_owner_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:29
+
+import django.utils.timezone
+from datetime import timedelta
+
+from django.db import migrations, models
+
+# Records archived by one end_session used to get their own auto_now_add
+# times, microseconds apart. Records of a quiz closer than this to the
+# previous one are treated as the same session and get its last timestamp.
+SESSION_GAP = timedelta(seconds=1)
+
+
+def group_sessions(apps, schema_editor):
+    QuizHistory = apps.get_model('QuizMania', 'QuizHistory')
+    updates = {}
+    session, session_end, previous = [], None, None
+    for record_id, quiz_id, completed_at in QuizHistory.objects.order_by('quiz_id', 'completed_at', 'id').values_list(
+        'id', 'quiz_id', 'completed_at'
+    ).iterator():
+        if previous is None or quiz_id != previous[0] or completed_at - previous[1] > SESSION_GAP:
+            for pk in session:
+                updates.setdefault(session_end, []).append(pk)
+            session = []
+        session.append(record_id)
+        session_end = completed_at
+        previous = (quiz_id, completed_at)
+    for pk in session:
+        updates.setdefault(session_end, []).append(pk)
+
+    for completed_at, ids in updates.items():
+        if len(ids) > 1:
+            QuizHistory.objects.filter(id__in=ids).update(completed_at=completed_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0010_quiz_last_session_size_owner_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizhistory',
+            name='completed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(group_sessions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quizhistory',
+            index=models.Index(fields=['quiz', 'completed_at'], name='history_quiz_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizhistory',
+            index=models.Index(fields=['quiz', 'score'], name='history_quiz_score_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0011_quizhistory_session_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChoiceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('picks', models.IntegerField(default=0)),
+                ('choice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='QuizMania.choice')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('answered', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='QuizMania.question')),
+            ],
+        ),
+    ]
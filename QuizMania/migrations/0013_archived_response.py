@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0012_question_choice_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizhistory',
+            name='source_taker_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('history', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='QuizMania.quizhistory')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='QuizMania.question')),
+                ('selected_choice', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='QuizMania.choice')),
+            ],
+        ),
+    ]
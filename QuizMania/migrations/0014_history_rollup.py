@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0013_archived_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=5)),
+                ('period_start', models.DateTimeField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('sessions', models.IntegerField(default=0)),
+                ('total_score', models.IntegerField(default=0)),
+                ('best_score', models.IntegerField(blank=True, null=True)),
+                ('lowest_score', models.IntegerField(blank=True, null=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_rollups', to='QuizMania.quiz')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('quiz', 'period', 'period_start'), name='history_rollup_unique_period')],
+            },
+        ),
+    ]
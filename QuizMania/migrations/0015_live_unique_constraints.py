@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+# Sessions running before these constraints may hold duplicates; they are
+# resolved before the constraints are added:
+# - repeated answers to a question keep the latest one,
+# - repeated takers for one account keep the first (a later lookup raised
+#   MultipleObjectsReturned anyway),
+# - repeated aliases get the taker id appended, so no scores are lost.
+
+
+def remove_duplicates(apps, schema_editor):
+    # Runs on whichever database holds the live tables (see routers.py)
+    db = schema_editor.connection.alias
+    QuizTaker = apps.get_model('QuizMania', 'QuizTaker')
+    UserResponse = apps.get_model('QuizMania', 'UserResponse')
+    takers, responses = QuizTaker.objects.using(db), UserResponse.objects.using(db)
+
+    answers = responses.values('quiz_taker', 'question').annotate(n=Count('id'), keep=Max('id')).filter(n__gt=1)
+    for row in answers.iterator():
+        responses.filter(quiz_taker=row['quiz_taker'], question=row['question']).exclude(id=row['keep']).delete()
+
+    accounts = takers.filter(user__isnull=False).values('quiz', 'user').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    for row in accounts.iterator():
+        takers.filter(quiz=row['quiz'], user=row['user']).exclude(id=row['keep']).delete()
+
+    aliases = takers.values('quiz', 'alias').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    for row in aliases.iterator():
+        for taker in takers.filter(quiz=row['quiz'], alias=row['alias']).exclude(id=row['keep']):
+            taker.alias = f"{taker.alias[:240]} ({taker.id})"
+            taker.save(using=db, update_fields=['alias'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0014_history_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop, hints={'model_name': 'quiztaker'}),
+        migrations.AddConstraint(
+            model_name='quiztaker',
+            constraint=models.UniqueConstraint(fields=('quiz', 'alias'), name='quiztaker_unique_alias'),
+        ),
+        migrations.AddConstraint(
+            model_name='quiztaker',
+            constraint=models.UniqueConstraint(fields=('quiz', 'user'), name='quiztaker_unique_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='userresponse',
+            constraint=models.UniqueConstraint(fields=('quiz_taker', 'question'), name='userresponse_unique_answer'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QuizMania', '0016_live_db_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizcodeblock',
+            name='token',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+    ]
@@ -1,15 +1,21 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
-import random
-import string
+from django.utils import timezone
+
+from .codes import allocate_code, discard_block
+
+# Attempts at saving a new quiz whose code turns out to be taken already
+CODE_COLLISION_RETRIES = 5
 
 def generate_unique_code():
-    length = 6
-    while True:
-        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-        if Quiz.objects.filter(code=code).count() == 0:
-            break
-    return code
+    # No existence check needed: allocated codes never repeat (see codes.py)
+    return allocate_code()
+
+class QuizCodeBlock(models.Model):
+    # Each row reserves a block of quiz code sequence indexes for one process
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Random per reservation, so a rolled-back reservation is not mistaken for a later one reusing its id
+    token = models.UUIDField(null=True, editable=False)
 
 class Quiz(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -17,6 +23,30 @@ class Quiz(models.Model):
     code = models.CharField(max_length=6, default=generate_unique_code, editable=False, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Participants archived when the last session was ended
+    last_session_size = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of an owner's quizzes, most recently used first (home page)
+            models.Index(fields=['owner', 'updated_at'], name='quiz_owner_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # Allocated codes are unique among themselves, but may still hit an older
+        # random code (or one written by hand); draw again from a fresh block,
+        # since the rest of the one that collided may collide as well
+        for attempt in range(CODE_COLLISION_RETRIES):
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == CODE_COLLISION_RETRIES - 1 or not Quiz.objects.filter(code=self.code).exists():
+                    raise
+                discard_block()
+                self.code = generate_unique_code()
 
     def __str__(self):
         return self.title
@@ -40,11 +70,21 @@ class Choice(models.Model):
         return self.text
 
 class QuizTaker(models.Model):
-    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    # Live tables may sit in their own database (see routers.py), so their links
+    # to the rest of the schema are not enforced by the database
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, db_constraint=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_constraint=False)
     alias = models.CharField(max_length=255, default="Guest")
     score = models.IntegerField(default=0)
-    
+
+    class Meta:
+        constraints = [
+            # One taker per alias and per account in a session; the indexes behind
+            # them serve the join_session and quiz_view lookups
+            models.UniqueConstraint(fields=['quiz', 'alias'], name='quiztaker_unique_alias'),
+            models.UniqueConstraint(fields=['quiz', 'user'], name='quiztaker_unique_user'),
+        ]
+
     def __str__(self):
         return self.user.username
 
@@ -52,15 +92,82 @@ class QuizHistory(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='history')
     player_name = models.CharField(max_length=255)
     score = models.IntegerField()
-    completed_at = models.DateTimeField(auto_now_add=True)
+    # end_session_view stamps every record of a session with the same time, so it identifies the session
+    completed_at = models.DateTimeField(default=timezone.now)
+    # QuizTaker the record was archived from; links the archived responses while archiving
+    source_taker_id = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Paging and per-session grouping on the history page
+            models.Index(fields=['quiz', 'completed_at'], name='history_quiz_completed_idx'),
+            # Percentiles and top scorer
+            models.Index(fields=['quiz', 'score'], name='history_quiz_score_idx'),
+        ]
 
     def __str__(self):
         return f"{self.player_name} - {self.quiz.title}"
 
 class UserResponse(models.Model):
     quiz_taker = models.ForeignKey(QuizTaker, on_delete=models.CASCADE, related_name='responses')
-    question = models.ForeignKey(Question, on_delete=models.CASCADE)
-    selected_choice = models.ForeignKey(Choice, on_delete=models.CASCADE, null=True, blank=True)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, db_constraint=False)
+    selected_choice = models.ForeignKey(Choice, on_delete=models.CASCADE, null=True, blank=True, db_constraint=False)
+
+    class Meta:
+        constraints = [
+            # One answer per question; also the index for a taker's responses
+            models.UniqueConstraint(fields=['quiz_taker', 'question'], name='userresponse_unique_answer'),
+        ]
+
+    def __str__(self):
+        return f"{self.quiz_taker.alias} - {self.question.text[:20]}"
+
+class ArchivedResponse(models.Model):
+    # A taker's answer, kept with their QuizHistory record when the session ends (see archive.py)
+    history = models.ForeignKey(QuizHistory, on_delete=models.CASCADE, related_name='responses')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='+')
+    selected_choice = models.ForeignKey(Choice, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    def __str__(self):
+        return f"{self.history.player_name} - {self.question.text[:20]}"
+
+class QuestionSummary(models.Model):
+    # Running per-question totals over every ended session (see analytics.record_session)
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='summary')
+    attempts = models.IntegerField(default=0)
+    answered = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.question.text[:20]} - {self.correct}/{self.attempts}"
+
+class ChoiceSummary(models.Model):
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, related_name='summary')
+    picks = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.choice.text[:20]} - {self.picks}"
+
+class HistoryRollup(models.Model):
+    # Totals of QuizHistory records removed by the compact_history command (see retention.py),
+    # one row per quiz and period
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='history_rollups')
+    period = models.CharField(max_length=5)  # 'day', 'week' or 'month'
+    period_start = models.DateTimeField()
+    attempts = models.IntegerField(default=0)
+    sessions = models.IntegerField(default=0)
+    total_score = models.IntegerField(default=0)
+    best_score = models.IntegerField(null=True, blank=True)
+    lowest_score = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'period', 'period_start'], name='history_rollup_unique_period'),
+        ]
+
+    @property
+    def mean(self):
+        return self.total_score / self.attempts if self.attempts else None
 
     def __str__(self):
-        return f"{self.quiz_taker.alias} - {self.question.text[:20]}"
\ No newline at end of file
+        return f"{self.quiz.title} - {self.period} of {self.period_start:%Y-%m-%d}"
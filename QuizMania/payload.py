@@ -0,0 +1,55 @@
+import json
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .models import Quiz, Question, Choice
+
+# The question/choice payload the quiz page plays from is the same for every
+# participant, so it is built once per (quiz, updated_at) and shared: as the
+# compact JSON served by the quiz_payload endpoint, and as the rendered
+# <script> fragment inlined into quiz_view. Saving the quiz changes the key,
+# so nothing has to be invalidated by hand.
+PAYLOAD_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(quiz):
+    return f'quizmania:payload:{quiz.id}:{quiz.updated_at.timestamp()}'
+
+
+def _build(quiz):
+    choices = {}
+    for choice_id, question_id, text, is_correct in Choice.objects.filter(
+        question__quiz_id=quiz.id
+    ).order_by('id').values_list('id', 'question_id', 'text', 'is_correct'):
+        choices.setdefault(question_id, []).append({'id': choice_id, 'text': text, 'is_correct': is_correct})
+
+    questions = [
+        {'id': question_id, 'text': text, 'marks': marks, 'duration': duration, 'choices': choices.get(question_id, [])}
+        for question_id, text, marks, duration in Question.objects.filter(
+            quiz_id=quiz.id
+        ).order_by('id').values_list('id', 'text', 'marks', 'duration')
+    ]
+    return {
+        'json': json.dumps(questions, separators=(',', ':')),
+        'fragment': render_to_string('QuizMania/partials/quiz_payload_partial.html', {'questions': questions}),
+    }
+
+
+def get_payload(quiz):
+    """
+    Returns {'json': str, 'fragment': str} for the quiz, building it with
+    two queries the first time it is asked for at this updated_at.
+    """
+    key = _cache_key(quiz)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _build(quiz)
+        cache.set(key, payload, PAYLOAD_CACHE_TIMEOUT)
+    return payload
+
+
+def etag(request, quiz_code, username):
+    # Used by @condition on the JSON endpoint: the payload only changes when the quiz is saved
+    updated_at = Quiz.objects.filter(code=quiz_code).values_list('updated_at', flat=True).first()
+    return str(updated_at.timestamp()) if updated_at else None
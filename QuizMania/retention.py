@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import ArchivedResponse, HistoryRollup, QuizHistory
+
+# Retention for QuizHistory. Records older than the retention window are
+# rolled up into one HistoryRollup per quiz and period (attempts, sessions,
+# total/best/lowest score) and then deleted with their archived responses.
+#
+# Work is done one quiz at a time in small batches of whole sessions, each in
+# its own short transaction, with a pause in between so live sessions can
+# take the SQLite write lock. A batch is aggregated before its transaction
+# starts; the transaction deletes first (so it holds the write lock from its
+# first statement) and is rolled back and retried if the number of deleted
+# records does not match what was aggregated.
+#
+# The per-question analytics (QuestionSummary / ChoiceSummary) are separate
+# totals and are left as they are.
+
+PERIODS = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+
+
+class BatchChanged(Exception):
+    """Raised inside a batch's transaction when its records changed after they were aggregated."""
+
+
+def retention_cutoff(days=None):
+    if days is None:
+        days = settings.QUIZMANIA_HISTORY_RETENTION_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def expired_history(older_than):
+    return QuizHistory.objects.filter(completed_at__lt=older_than)
+
+
+def compact_history(older_than, period=None, batch_size=1000, pause=0.05, progress=None):
+    """
+    Rolls up and deletes every QuizHistory record completed before
+    ``older_than``, in batches of about ``batch_size`` records. Calls
+    ``progress(compacted, held)`` after each batch with the running total and
+    the seconds the batch held its transaction open. Returns the number of
+    records compacted.
+    """
+    period = period or settings.QUIZMANIA_HISTORY_ROLLUP_PERIOD
+    trunc = PERIODS[period]
+    # Read once up front; the (quiz, completed_at) index covers it
+    quiz_ids = list(expired_history(older_than).values_list('quiz_id', flat=True).distinct().order_by('quiz_id'))
+
+    compacted = 0
+    for quiz_id in quiz_ids:
+        while True:
+            batch = _next_batch(quiz_id, older_than, batch_size)
+            try:
+                started = time.perf_counter()
+                done = _compact_batch(quiz_id, batch, trunc, period)
+                held = time.perf_counter() - started
+            except BatchChanged:
+                continue
+            if not done:
+                break
+            compacted += done
+            if progress:
+                progress(compacted, held)
+            if pause:
+                time.sleep(pause)
+    return compacted
+
+
+def _next_batch(quiz_id, older_than, batch_size):
+    # The oldest batch_size records, extended to the end of the last session so a session is never split
+    records = expired_history(older_than).filter(quiz_id=quiz_id)
+    last = list(records.order_by('completed_at').values_list('completed_at', flat=True)[batch_size - 1:batch_size])
+    return records.filter(completed_at__lte=last[0]) if last else records
+
+
+def _compact_batch(quiz_id, batch, trunc, period):
+    totals = list(
+        batch.annotate(period_start=trunc('completed_at'))
+        .values('period_start')
+        .annotate(
+            attempts=Count('id'),
+            sessions=Count('completed_at', distinct=True),
+            total_score=Sum('score'),
+            best_score=Max('score'),
+            lowest_score=Min('score'),
+        )
+        .order_by()
+    )
+    expected = sum(t['attempts'] for t in totals)
+    if not expected:
+        return 0
+
+    with transaction.atomic():
+        ArchivedResponse.objects.filter(history__in=batch).delete()
+        deleted = batch.delete()[1].get(QuizHistory._meta.label, 0)
+        if deleted != expected:
+            raise BatchChanged
+
+        existing = {
+            r.period_start: r
+            for r in HistoryRollup.objects.filter(
+                quiz_id=quiz_id, period=period, period_start__in=[t['period_start'] for t in totals]
+            )
+        }
+        rollups = []
+        for t in totals:
+            rollup = existing.get(t['period_start']) or HistoryRollup(
+                quiz_id=quiz_id, period=period, period_start=t['period_start']
+            )
+            rollup.attempts += t['attempts']
+            rollup.sessions += t['sessions']
+            rollup.total_score += t['total_score']
+            rollup.best_score = max(s for s in (rollup.best_score, t['best_score']) if s is not None)
+            rollup.lowest_score = min(s for s in (rollup.lowest_score, t['lowest_score']) if s is not None)
+            rollups.append(rollup)
+        HistoryRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['quiz', 'period', 'period_start'],
+            update_fields=['attempts', 'sessions', 'total_score', 'best_score', 'lowest_score'],
+        )
+    return expected
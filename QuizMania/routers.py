@@ -0,0 +1,46 @@
+LIVE_DB = 'live'
+LIVE_MODELS = {'quiztaker', 'userresponse'}
+
+# Optional split of the live-session tables into their own database.
+#
+# QuizTaker and UserResponse take every join, answer and submit, while quiz
+# content and history are mostly read. With a "live" entry in DATABASES
+# (QUIZMANIA_LIVE_DB_NAME, see settings.py) this router sends both live
+# models there, so a burst of submits holding the live database's write
+# lock does not block quiz authoring or history pages, and everything else
+# stays in "default".
+#
+# Relations from the live tables to Quiz, Question, Choice and User cross
+# databases, so those foreign keys have no database constraint and are not
+# joined across: code reads the ids and queries each side separately.
+# Deletes do not cascade across databases either; signals.py clears the live
+# rows of a quiz or user being deleted. The live tables are also created (and
+# stay empty) in "default", so cascades collected there find nothing to delete.
+#
+# Ending a session copies into "default" and then clears "live", in two
+# transactions; see archive.py for how that stays consistent.
+
+
+def is_live(model):
+    return model._meta.app_label == 'QuizMania' and model._meta.model_name in LIVE_MODELS
+
+
+class LiveRouter:
+
+    def db_for_read(self, model, **hints):
+        # Everything else is pinned to default, so following a relation from a live row reads the right database
+        return LIVE_DB if is_live(model) else 'default'
+
+    def db_for_write(self, model, **hints):
+        return LIVE_DB if is_live(model) else 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # _meta rather than type(): request.user is a lazy proxy around the User
+        if is_live(obj1) or is_live(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == LIVE_DB:
+            return app_label == 'QuizMania' and model_name in LIVE_MODELS
+        return None
@@ -0,0 +1,234 @@
+import time
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.db import router, transaction
+
+from .models import Choice, Question, QuizTaker, UserResponse
+
+# How many compiled answer keys each process keeps. Keys of quizzes that were
+# saved since (new updated_at) simply fall out of the LRU.
+ANSWER_KEY_CACHE_SIZE = 512
+
+# Rendered check-answers reviews are cached per taker until they answer again
+REVIEW_CACHE_TIMEOUT = 60 * 60
+
+QuestionKey = namedtuple('QuestionKey', ['marks', 'choice_ids', 'correct_choice_ids'])
+
+
+class AnswerKey:
+    """
+    Immutable, compiled answer key of one quiz: question id -> marks, the
+    ids of its valid choices and the ids of its correct ones.
+    """
+
+    def __init__(self, questions):
+        self.questions = MappingProxyType(questions)
+
+    def is_correct(self, question_id, choice_id):
+        question = self.questions.get(question_id)
+        return question is not None and choice_id in question.correct_choice_ids
+
+    def is_valid(self, question_id, choice_id):
+        question = self.questions.get(question_id)
+        return question is not None and choice_id in question.choice_ids
+
+
+@lru_cache(maxsize=ANSWER_KEY_CACHE_SIZE)
+def _compile_answer_key(quiz_id, updated_at):
+    choices = {}
+    correct = {}
+    for choice_id, question_id, is_correct in Choice.objects.filter(
+        question__quiz_id=quiz_id
+    ).values_list('id', 'question_id', 'is_correct'):
+        choices.setdefault(question_id, set()).add(choice_id)
+        if is_correct:
+            correct.setdefault(question_id, set()).add(choice_id)
+
+    questions = {
+        question_id: QuestionKey(
+            marks,
+            frozenset(choices.get(question_id, ())),
+            frozenset(correct.get(question_id, ())),
+        )
+        for question_id, marks in Question.objects.filter(quiz_id=quiz_id).values_list('id', 'marks')
+    }
+    return AnswerKey(questions)
+
+
+def get_answer_key(quiz):
+    """
+    Returns the compiled AnswerKey of a quiz. It is built once per
+    (quiz, updated_at), so saving the quiz invalidates it.
+    """
+    return _compile_answer_key(quiz.id, quiz.updated_at)
+
+
+def _review_cache_key(quiz, taker_id):
+    # Every write to a taker's responses moves them to a new generation, so
+    # a review rendered from older answers can never be served again, even
+    # if it is stored after the write. Saving the quiz also changes the key.
+    generation = cache.get_or_set(f'quizmania:review-gen:{taker_id}', time.time_ns, REVIEW_CACHE_TIMEOUT)
+    return f'quizmania:review:{taker_id}:{generation}:{quiz.updated_at.timestamp()}'
+
+
+def get_review(quiz, taker_id, render):
+    """
+    Returns the rendered answer review of a taker, calling ``render()`` to
+    build it only if there is no cached copy for their current answers.
+    """
+    key = _review_cache_key(quiz, taker_id)
+    review = cache.get(key)
+    if review is None:
+        review = render()
+        cache.set(key, review, REVIEW_CACHE_TIMEOUT)
+    return review
+
+
+def invalidate_reviews(taker_ids):
+    """
+    Drops cached reviews of these takers once the current transaction (if
+    any) has committed their new responses.
+    """
+    taker_ids = list(taker_ids)
+    if taker_ids:
+        transaction.on_commit(lambda: cache.set_many(
+            {f'quizmania:review-gen:{taker_id}': time.time_ns() for taker_id in taker_ids},
+            REVIEW_CACHE_TIMEOUT,
+        ), using=router.db_for_write(UserResponse))
+
+
+def _parse_answers(answers):
+    """
+    Turns raw {question id: choice id} form values into ints, dropping
+    anything that is not a number.
+    """
+    parsed = {}
+    for question_id, choice_id in answers.items():
+        try:
+            parsed[int(question_id)] = int(choice_id)
+        except (TypeError, ValueError):
+            continue
+    return parsed
+
+
+def grade_submission(quiz, answers):
+    """
+    Grades a full quiz submission against the cached answer key without
+    touching the database.
+
+    ``answers`` maps question ids to selected choice ids as posted by the
+    quiz page. Choices that do not belong to the question they were posted
+    for are ignored. Returns ``(score, responses)`` where responses is a
+    list of valid (question id, choice id) pairs.
+    """
+    answers = _parse_answers(answers)
+    key = get_answer_key(quiz)
+
+    score = 0
+    responses = []
+    for question_id, choice_id in answers.items():
+        # Validate that the choice actually belongs to this question
+        if not key.is_valid(question_id, choice_id):
+            continue
+        responses.append((question_id, choice_id))
+        if key.is_correct(question_id, choice_id):
+            score += key.questions[question_id].marks
+    return score, responses
+
+
+def save_submission(quiz_taker, score, responses):
+    """
+    Replaces the taker's stored responses and score in one transaction.
+    """
+    # The live tables may have their own database (see routers.py)
+    with transaction.atomic(using=router.db_for_write(UserResponse)):
+        # Clear previous responses for this attempt
+        UserResponse.objects.filter(quiz_taker=quiz_taker).delete()
+        UserResponse.objects.bulk_create([
+            UserResponse(quiz_taker=quiz_taker, question_id=question_id, selected_choice_id=choice_id)
+            for question_id, choice_id in responses
+        ])
+
+        quiz_taker.score = score
+        quiz_taker.save(update_fields=['score'])
+        invalidate_reviews([quiz_taker.pk])
+
+
+def score_submission(quiz, quiz_taker, answers):
+    """
+    Grades a submission and stores it straight away; the only queries are
+    the writes. Returns the new score.
+    """
+    score, responses = grade_submission(quiz, answers)
+    save_submission(quiz_taker, score, responses)
+    return score
+
+
+def record_answer(quiz, quiz_taker, question_id, choice_id):
+    """
+    Stores a single answer as the quiz is being played and brings the
+    taker's running score up to date. Idempotent: sending
+    the same answer again changes nothing. A ``choice_id`` of None clears
+    the answer (the question timed out).
+
+    Returns ``(score, is_correct)``, or None if the question is not part of
+    this quiz or the choice does not belong to it.
+    """
+    key = get_answer_key(quiz)
+    question = key.questions.get(question_id)
+    if question is None or (choice_id is not None and choice_id not in question.choice_ids):
+        return None
+
+    with transaction.atomic(using=router.db_for_write(UserResponse)):
+        # Write before reading anything: on SQLite a transaction that reads
+        # first and then writes fails with "database is locked" when another
+        # writer got in between, instead of waiting for the lock.
+        if choice_id is None:
+            UserResponse.objects.filter(quiz_taker_id=quiz_taker.pk, question_id=question_id).delete()
+        else:
+            # One upsert on the (quiz_taker, question) unique constraint
+            UserResponse.objects.bulk_create(
+                [UserResponse(quiz_taker_id=quiz_taker.pk, question_id=question_id, selected_choice_id=choice_id)],
+                update_conflicts=True,
+                unique_fields=['quiz_taker', 'question'],
+                update_fields=['selected_choice'],
+            )
+
+        # The running score is re-derived from this taker's own answers with
+        # the cached key, which keeps retries and changed answers exact.
+        score = sum(
+            key.questions[answered_id].marks
+            for answered_id, answered_choice in UserResponse.objects.filter(
+                quiz_taker_id=quiz_taker.pk
+            ).values_list('question_id', 'selected_choice_id')
+            if key.is_correct(answered_id, answered_choice)
+        )
+        if score != quiz_taker.score:
+            QuizTaker.objects.filter(pk=quiz_taker.pk).update(score=score)
+        quiz_taker.score = score
+        invalidate_reviews([quiz_taker.pk])
+
+    is_correct = choice_id is not None and choice_id in question.correct_choice_ids
+    return quiz_taker.score, is_correct
+
+
+def finalize_submission(quiz, quiz_taker, answers):
+    """
+    Cheap end-of-quiz check for takers whose answers were already stored one
+    by one through record_answer(). If the stored responses match the final
+    submission, only the score is reconciled (normally a no-op) and True is
+    returned; otherwise nothing is written and the caller should fall back
+    to a full submission.
+    """
+    score, responses = grade_submission(quiz, answers)
+    stored = set(UserResponse.objects.filter(quiz_taker=quiz_taker).values_list('question_id', 'selected_choice_id'))
+    if stored != set(responses):
+        return False
+
+    if quiz_taker.score != score:
+        QuizTaker.objects.filter(pk=quiz_taker.pk).update(score=score)
+        quiz_taker.score = score
+    return True
@@ -0,0 +1,35 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from . import live
+from .models import Quiz, QuizTaker
+
+# Deletes do not cascade into a separate live database (see routers.py), so
+# deleting a quiz or a user first clears their QuizTaker rows (and with them
+# the UserResponse rows) there. This also covers deletes made from the admin
+# and quizzes deleted along with their owner. With a single database the
+# cascade would find the same rows; clearing them first changes nothing.
+
+
+def _clear_takers(takers, quiz_codes):
+    takers.delete()
+    # Cached sessions are dropped once the delete commits, so they reload without these takers
+    for quiz_code in quiz_codes:
+        transaction.on_commit(partial(live.forget, quiz_code), using=router.db_for_write(Quiz))
+
+
+@receiver(pre_delete, sender=Quiz)
+def clear_quiz_takers(sender, instance, **kwargs):
+    _clear_takers(QuizTaker.objects.filter(quiz_id=instance.id), [instance.code])
+
+
+@receiver(pre_delete, sender=User)
+def clear_user_takers(sender, instance, **kwargs):
+    takers = QuizTaker.objects.filter(user_id=instance.id)
+    # Two queries: the quizzes may live in another database
+    quiz_ids = set(takers.values_list('quiz_id', flat=True))
+    _clear_takers(takers, Quiz.objects.filter(id__in=quiz_ids).values_list('code', flat=True))
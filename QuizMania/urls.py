@@ -13,15 +13,22 @@ urlpatterns = [
     path('quiz/<str:quiz_code>/', views.quiz_master_dashboard, name='quiz_master_dashboard'),
     path('join_session/', views.join_session, name='join_session'),
     path('quiz/<str:quiz_code>/results/', views.results_view, name='results_view'),
+    path('api/quiz/<str:quiz_code>/snapshot/', views.live_snapshot, name='live_snapshot'),
     path('api/quiz/<str:quiz_code>/live_count/', views.live_count, name='live_count'),
     path('api/quiz/<str:quiz_code>/live_scoreboard/', views.live_scoreboard, name='live_scoreboard'),
+    path('api/quiz/<str:quiz_code>/live_scoreboard/delta/', views.live_scoreboard_delta, name='live_scoreboard_delta'),
     path('api/quiz/<str:quiz_code>/live_participants_list/', views.live_participants_list, name='live_participants_list'),
+    path('api/quiz/<str:quiz_code>/stream/', views.live_stream, name='live_stream'),
+    path('api/cache_stats/', views.cache_stats, name='cache_stats'),
     path('quiz/<str:quiz_code>/live_participants/', views.live_participants_view, name='live_participants'),
     path('quiz/<str:quiz_code>/live_scoreboard/', views.live_scoreboard_view, name='live_scoreboard_view'),
     path('quiz/<str:quiz_code>/end/', views.end_session_view, name='end_session'),
     path('quiz/<str:quiz_code>/history/', views.quiz_history_view, name='quiz_history'),
+    path('quiz/<str:quiz_code>/analytics/', views.quiz_analytics_view, name='quiz_analytics'),
     path('quiz/<str:quiz_code>/history/delete/', views.delete_quiz_history, name='delete_quiz_history'),
     path('quiz/<str:quiz_code>/delete/', views.delete_quiz, name='delete_quiz'),
     path('quiz/<str:quiz_code>/check_answers/', views.check_answers_view, name='check_answers'),
+    path('quiz/<str:quiz_code>/<str:username>/payload/', views.quiz_payload, name='quiz_payload'),
+    path('quiz/<str:quiz_code>/<str:username>/answer/', views.quiz_answer, name='quiz_answer'),
     path('quiz/<str:quiz_code>/<str:username>/', views.quiz_view, name='quiz_view'),
 ]
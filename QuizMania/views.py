@@ -1,10 +1,24 @@
+from datetime import datetime
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from .models import Quiz, Question, Choice, QuizTaker, QuizHistory, UserResponse
+from .models import Quiz, Question, QuizTaker, QuizHistory, HistoryRollup, UserResponse
+from django.db import IntegrityError
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from . import analytics, live, ingest, microcache, payload
+from .microcache import micro_cache
+from .archive import archive_session
+from .bulk import create_quiz, parse_quiz_form
+from .history import history_rollups, history_stats, session_summaries
+from .scoring import score_submission, get_answer_key, record_answer, finalize_submission, get_review
 
 def register(request):
     if request.user.is_authenticated:
@@ -177,45 +191,10 @@ def review_generated_quiz(request):
 def start_session(request):
     if request.method == 'POST':
         title = request.POST.get('title')
-        quiz = Quiz.objects.create(title=title, owner=request.user)
 
-        # Process dynamically added questions
-        question_keys = [key for key in request.POST if key.startswith('question_text_')]
-        
-        # Extract unique question IDs from the keys
-        question_ids = []
-        for key in question_keys:
-            try:
-                q_id = int(key.split('_')[-1])
-                question_ids.append(q_id)
-            except (ValueError, IndexError):
-                continue
-        question_ids = sorted(list(set(question_ids)))
-
-        for q_id in question_ids:
-            question_text = request.POST.get(f'question_text_{q_id}')
-            
-            try:
-                marks = int(request.POST.get(f'marks_{q_id}', 10))
-                duration = int(request.POST.get(f'duration_{q_id}', 5))
-            except (ValueError, TypeError):
-                marks = 10
-                duration = 5
-
-            question = Question.objects.create(
-                quiz=quiz, 
-                text=question_text, 
-                marks=marks, 
-                duration=duration,
-                explanation=request.POST.get(f'answer_{q_id}', '') # Use 'answer' field as explanation
-            )
-
-            # Process options for this question
-            for i in range(1, 5): # Assuming 4 options
-                option_text = request.POST.get(f'option_{i}_{q_id}')
-                if option_text and option_text.strip():
-                    is_correct = request.POST.get(f'correct_option_{q_id}') == str(i)
-                    Choice.objects.create(question=question, text=option_text, is_correct=is_correct)
+        # Process dynamically added questions; the quiz, its questions and
+        # choices are bulk inserted in one transaction
+        quiz = create_quiz(request.user, title, parse_quiz_form(request.POST))
 
         return redirect('quiz_master_dashboard', quiz_code=quiz.code)
     
@@ -229,8 +208,8 @@ def quiz_master_dashboard(request, quiz_code):
     if request.user != quiz.owner:
         return redirect('home')
 
-    quiz_takers = QuizTaker.objects.filter(quiz=quiz)
-    return render(request, 'QuizMania/quiz_master_dashboard.html', {'quiz': quiz, 'quiz_takers': quiz_takers})
+    session = live.get_session_or_404(quiz_code)
+    return render(request, 'QuizMania/quiz_master_dashboard.html', {'quiz': quiz, 'quiz_takers': session.roster(), 'live_count': session.count})
 
 def join_session(request):
     if request.method == 'POST':
@@ -243,18 +222,25 @@ def join_session(request):
         try:
             quiz = Quiz.objects.get(code=code)
             
+            # Aliases are unique per quiz (quiztaker_unique_alias) to avoid confusion on the scoreboard
+            alias_taken = {'error': f"The name '{username}' is already in this quiz. Please choose another."}
+
             # Authenticated User Logic (Registered Students or Owner)
             if request.user.is_authenticated:
-                quiz_taker, created = QuizTaker.objects.get_or_create(quiz=quiz, user=request.user, defaults={'alias': username})
+                try:
+                    quiz_taker, created = QuizTaker.objects.get_or_create(quiz=quiz, user=request.user, defaults={'alias': username})
+                except IntegrityError:
+                    return render(request, 'QuizMania/join_session.html', alias_taken)
+                if created:
+                    live.record_taker(quiz.code, quiz_taker)
             else:
                 # GUEST LOGIC (No User Account Created)
-                # Check for alias collision in this specific quiz (Prevent Duplicates if possible, or just allow common names?)
-                # Decision: Prevent exact duplicate in same active session to avoid confusion on scoreboard.
-                if QuizTaker.objects.filter(quiz=quiz, alias=username).exists():
-                     return render(request, 'QuizMania/join_session.html', {'error': f"The name '{username}' is already in this quiz. Please choose another."})
-                
-                # Create guest taker (User is NULL)
-                quiz_taker = QuizTaker.objects.create(quiz=quiz, user=None, alias=username)
+                # Create guest taker (User is NULL); the unique constraint rejects a duplicate alias
+                try:
+                    quiz_taker = QuizTaker.objects.create(quiz=quiz, user=None, alias=username)
+                except IntegrityError:
+                    return render(request, 'QuizMania/join_session.html', alias_taken)
+                live.record_taker(quiz.code, quiz_taker)
                 
                 # Store ID in session to identify this guest subsequently
                 request.session['quiz_taker_id'] = quiz_taker.id
@@ -264,10 +250,7 @@ def join_session(request):
             return render(request, 'QuizMania/join_session.html', {'error': 'Invalid quiz code'})
     return render(request, 'QuizMania/join_session.html')
 
-# Removed @login_required to allow Guests
-def quiz_view(request, quiz_code, username):
-    quiz = get_object_or_404(Quiz, code=quiz_code)
-    
+def _get_quiz_taker(request, quiz, username):
     quiz_taker = None
 
     # 1. Try Authenticated User (Registered or Owner)
@@ -290,6 +273,13 @@ def quiz_view(request, quiz_code, username):
                     quiz_taker = found_taker
             except QuizTaker.DoesNotExist:
                 pass
+
+    return quiz_taker
+
+# Removed @login_required to allow Guests
+def quiz_view(request, quiz_code, username):
+    quiz = get_object_or_404(Quiz, code=quiz_code)
+    quiz_taker = _get_quiz_taker(request, quiz, username)
     
     # 3. Access Denied if no valid taker found
     if not quiz_taker:
@@ -303,80 +293,163 @@ def quiz_view(request, quiz_code, username):
         if not quiz_taker:
              return redirect('join_session')
 
-        score = 0
-        print(f"DEBUG: Processing Quiz Submission for {quiz_taker.alias} - Quiz {quiz.code}", flush=True)
-        # Clear previous responses for this attempt
-        UserResponse.objects.filter(quiz_taker=quiz_taker).delete()
-        
-        for question in quiz.questions.all():
-            selected_choice_id = request.POST.get(f'question_{question.id}')
-            print(f"DEBUG: Q{question.id} ({question.text[:10]}...) - Selected ID: {selected_choice_id}", flush=True)
-            
-            if selected_choice_id:
-                # Validate that the choice actually belongs to this question
-                choice = Choice.objects.filter(id=selected_choice_id, question=question).first()
-                if choice:
-                    # Save response
-                    UserResponse.objects.create(
-                        quiz_taker=quiz_taker,
-                        question=question,
-                        selected_choice=choice
-                    )
-                    # print(f"DEBUG: Saved Response for Q{question.id}", flush=True)
-                    
-                    if choice.is_correct:
-                        score += question.marks
-        
-        quiz_taker.score = score
-        quiz_taker.save()
+        answers = {
+            key[len('question_'):]: value
+            for key, value in request.POST.items()
+            if key.startswith('question_') and value
+        }
+        if request.POST.get('finalize') and finalize_submission(quiz, quiz_taker, answers):
+            # Answers were already stored one by one through quiz_answer; nothing left to write
+            pass
+        elif ingest.enabled():
+            # Write-behind mode: graded and journaled now, written to the database by the flusher
+            ingest.submit(quiz, quiz_taker, answers)
+        else:
+            score_submission(quiz, quiz_taker, answers)
+        live.record_taker(quiz.code, quiz_taker)
         return redirect('results_view', quiz_code=quiz.code)
     
-    questions = quiz.questions.all()
-    # Pass quiz_taker context so template can show name
-    return render(request, 'QuizMania/quiz_view.html', {'quiz': quiz, 'questions': questions, 'quiz_taker': quiz_taker})
+    # Questions and choices come from the shared cached payload; only the taker is per request
+    return render(request, 'QuizMania/quiz_view.html', {
+        'quiz': quiz,
+        'payload_fragment': payload.get_payload(quiz)['fragment'],
+        'quiz_taker': quiz_taker,
+    })
+
+# Compact JSON of the quiz's questions and choices, the same data quiz_view inlines.
+# Built once per quiz version and shared by all participants; clients revalidate with the ETag.
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=payload.etag)
+def quiz_payload(request, quiz_code, username):
+    quiz = get_object_or_404(Quiz, code=quiz_code)
+    if not _get_quiz_taker(request, quiz, username) and request.user != quiz.owner:
+        return JsonResponse({'error': 'Not a participant of this quiz'}, status=403)
+    return HttpResponse(payload.get_payload(quiz)['json'], content_type='application/json')
+
+# Stores one answer while the quiz is being played (called by the quiz page as each question ends).
+# Upserts on (taker, question) so retries are harmless, and keeps the running score and live scoreboard current.
+@require_POST
+def quiz_answer(request, quiz_code, username):
+    quiz = get_object_or_404(Quiz, code=quiz_code)
+    quiz_taker = _get_quiz_taker(request, quiz, username)
+    if not quiz_taker:
+        return JsonResponse({'error': 'Not a participant of this quiz'}, status=403)
 
+    try:
+        question_id = int(request.POST.get('question_id', ''))
+        choice_id = request.POST.get('choice_id') or None
+        if choice_id is not None:
+            choice_id = int(choice_id)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid answer'}, status=400)
+
+    # A buffered full submission must not land on top of newer answers
+    ingest.flush_taker(quiz_taker.id)
+
+    result = record_answer(quiz, quiz_taker, question_id, choice_id)
+    if result is None:
+        return JsonResponse({'error': 'Invalid answer'}, status=400)
+
+    score, is_correct = result
+    live.record_taker(quiz.code, quiz_taker)
+    return JsonResponse({'score': score, 'is_correct': is_correct})
+
+def _student_results(request, quiz_code):
+    # The owner sees every taker and is not cached; everyone else gets the same top 5
+    session = live.get_session(quiz_code)
+    if session is None or request.user.id == session.owner_id:
+        return None
+    return request.user.is_authenticated
+
+@micro_cache(variant=_student_results)
 def results_view(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code)
+    session = live.get_session_or_404(quiz_code)
     
     # If owner, show ALL. If student, show top 5.
+    # Both come from the live leaderboard index, which is kept sorted as scores are saved.
     if request.user == quiz.owner:
-        quiz_takers = QuizTaker.objects.filter(quiz=quiz).order_by('-score')
+        quiz_takers = session.top()
     else:
-        quiz_takers = QuizTaker.objects.filter(quiz=quiz).order_by('-score')[:5]
+        quiz_takers = session.top(5)
         
     return render(request, 'QuizMania/results.html', {'quiz': quiz, 'quiz_takers': quiz_takers})
 
+# Live endpoints read the in-memory session state (see live.py) instead of querying QuizTaker.
+# Their ETag is the quiz's live version, so unchanged polls are answered with 304 before any serialization.
+@cache_control(no_cache=True)
+@micro_cache()
+@condition(etag_func=live.etag)
 def live_count(request, quiz_code):
-    quiz = get_object_or_404(Quiz, code=quiz_code)
-    count = QuizTaker.objects.filter(quiz=quiz).count()
-    return JsonResponse({'live_count': count})
+    session = live.get_session_or_404(quiz_code)
+    return JsonResponse({'live_count': session.count})
 
+@cache_control(no_cache=True)
+@micro_cache()
+@condition(etag_func=live.etag)
 def live_scoreboard(request, quiz_code):
-    quiz = get_object_or_404(Quiz, code=quiz_code)
-    quiz_takers = QuizTaker.objects.filter(quiz=quiz).order_by('-score')
-    data = [{'username': taker.alias, 'score': taker.score} for taker in quiz_takers]
-    return JsonResponse(data, safe=False)
+    session = live.get_session_or_404(quiz_code)
+    return JsonResponse(session.scoreboard(), safe=False)
 
+@cache_control(no_cache=True)
+@condition(etag_func=live.etag)
 def live_participants_list(request, quiz_code):
-    quiz = get_object_or_404(Quiz, code=quiz_code)
-    quiz_takers = QuizTaker.objects.filter(quiz=quiz)
-    data = [{'username': taker.alias} for taker in quiz_takers]
-    return JsonResponse(data, safe=False)
-
+    session = live.get_session_or_404(quiz_code)
+    return JsonResponse(session.roster(), safe=False)
+
+# Count, roster and ranked scores in one response for the host screens.
+# ?limit=N cuts the roster and scoreboard to N entries; live_count is always the full total.
+@cache_control(no_cache=True)
+@condition(etag_func=live.etag)
+def live_snapshot(request, quiz_code):
+    session = live.get_session_or_404(quiz_code)
+    limit = live.parse_limit(request.GET.get('limit'))
+    return JsonResponse(session.snapshot(limit))
+
+# Changes since the client's ?since=<version> cursor: changed takers plus ids of removed ones.
+# Responses carry the new version to send as the next cursor.
+@cache_control(no_cache=True)
+@condition(etag_func=live.etag)
+def live_scoreboard_delta(request, quiz_code):
+    session = live.get_session_or_404(quiz_code)
+    since = live.parse_version(request.GET.get('since'))
+    return JsonResponse(session.delta(since))
+
+# Server-Sent Events feed of roster and scoreboard changes (needs the ASGI server).
+# Under WSGI a 204 tells EventSource to stop and the pages fall back to polling the JSON endpoints above.
+async def live_stream(request, quiz_code):
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    session = await sync_to_async(live.get_session_or_404)(quiz_code)
+    since = live.parse_version(request.headers.get('Last-Event-ID'))
+    response = StreamingHttpResponse(live.event_stream(session, since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @login_required
 def live_participants_view(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code)
-    quiz_takers = QuizTaker.objects.filter(quiz=quiz)
-    return render(request, 'QuizMania/live_participants.html', {'quiz': quiz, 'quiz_takers': quiz_takers})
+    session = live.get_session_or_404(quiz_code)
+    return render(request, 'QuizMania/live_participants.html', {'quiz': quiz, 'quiz_takers': session.roster(), 'live_count': session.count})
 
 # Removed @login_required per user request (Students can see scoreboard)
+# The page only differs by the logout link, so it is micro-cached per login state
+@micro_cache(variant=lambda request, quiz_code: request.user.is_authenticated)
 def live_scoreboard_view(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code)
     return render(request, 'QuizMania/live_scoreboard.html', {'quiz': quiz})
 
 from django.views.decorators.csrf import csrf_exempt
 
+# Micro-cache hit/miss counts per view (see microcache.py), for staff
+@login_required
+def cache_stats(request):
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    return JsonResponse(microcache.stats())
+
 @csrf_exempt
 @login_required
 def end_session_view(request, quiz_code):
@@ -386,45 +459,101 @@ def end_session_view(request, quiz_code):
     if request.user != quiz.owner:
         return redirect('quiz_master_dashboard', quiz_code=quiz_code)
 
-    # Archive to History
-    takers = QuizTaker.objects.filter(quiz=quiz)
-    
-    history_records = []
-    for taker in takers:
-        history_records.append(QuizHistory(
-            quiz=quiz,
-            player_name=taker.alias,
-            score=taker.score
-        ))
-    
-    if history_records:
-        QuizHistory.objects.bulk_create(history_records)
-
-    # Update quiz timestamp to mark as recently active
-    quiz.save()
+    # Make sure buffered submissions are in the database before archiving
+    ingest.flush()
 
-    # Clear active session (Refresh)
-    QuizTaker.objects.filter(quiz=quiz).delete()
+    # Archive takers and their answers to history and clear the live tables, all in one transaction
+    archive_session(quiz)
+    live.end_session(quiz.code)
     
     # Redirect to history page so user sees the result immediately
     return redirect('quiz_history', quiz_code=quiz.code)
 
+HOME_PAGE_SIZE = 24
+
+def _count_per_quiz(queryset, value=Count('*')):
+    # Correlated subquery aggregating one related table per quiz row, so several
+    # of them can be annotated on the same query without multiplying each other
+    return Coalesce(Subquery(
+        queryset.filter(quiz=OuterRef('pk')).order_by().values('quiz').annotate(n=value).values('n')
+    ), 0)
+
+def _make_cursor(obj, field):
+    return f"{getattr(obj, field).isoformat()}_{obj.id}"
+
+def _parse_cursor(value):
+    try:
+        moment, obj_id = value.rsplit('_', 1)
+        return datetime.fromisoformat(moment), int(obj_id)
+    except (AttributeError, ValueError):
+        return None
+
+def _keyset_page(queryset, field, request, page_size):
+    # Newest-first keyset pagination on (field, id): ?after=<cursor> for older rows,
+    # ?before=<cursor> for newer ones. Returns (rows, next_cursor, prev_cursor).
+    after = _parse_cursor(request.GET.get('after'))
+    before = _parse_cursor(request.GET.get('before'))
+    if before:
+        # Walk backwards from the cursor, then flip the page into display order
+        page = list(queryset.filter(
+            Q(**{f'{field}__gt': before[0]}) | Q(**{field: before[0], 'id__gt': before[1]})
+        ).order_by(field, 'id')[:page_size + 1])
+        has_newer = len(page) > page_size
+        page = page[:page_size][::-1]
+        has_older = True
+    else:
+        if after:
+            queryset = queryset.filter(Q(**{f'{field}__lt': after[0]}) | Q(**{field: after[0], 'id__lt': after[1]}))
+        page = list(queryset.order_by(f'-{field}', '-id')[:page_size + 1])
+        has_older = len(page) > page_size
+        page = page[:page_size]
+        has_newer = after is not None
+
+    next_cursor = _make_cursor(page[-1], field) if page and has_older else None
+    prev_cursor = _make_cursor(page[0], field) if page and has_newer else None
+    return page, next_cursor, prev_cursor
+
 def home(request):
     quizzes = []
     quiz_count = 0
+    next_cursor = prev_cursor = None
     if request.user.is_authenticated:
-        # Order by updated_at so most recently used quizzes appear first
-        quizzes = Quiz.objects.filter(owner=request.user).order_by('-updated_at')
-        quiz_count = quizzes.count()
-    return render(request, 'QuizMania/home.html', {'quizzes': quizzes, 'quiz_count': quiz_count})
+        # Order by updated_at so most recently used quizzes appear first.
+        # Keyset pagination on (updated_at, id), served by the (owner, updated_at) index:
+        # every page costs the same however many quizzes the owner has.
+        quizzes = Quiz.objects.filter(owner=request.user).annotate(
+            question_count=_count_per_quiz(Question.objects.all()),
+            total_marks=_count_per_quiz(Question.objects.all(), Sum('marks')),
+            history_count=_count_per_quiz(QuizHistory.objects.all()),
+        )
+        quizzes, next_cursor, prev_cursor = _keyset_page(quizzes, 'updated_at', request, HOME_PAGE_SIZE)
+        # Counted apart: the live tables may be in their own database (see routers.py)
+        live_participants = dict(
+            QuizTaker.objects.filter(quiz__in=[quiz.id for quiz in quizzes])
+            .values('quiz').annotate(n=Count('id')).values_list('quiz', 'n')
+        ) if quizzes else {}
+        for quiz in quizzes:
+            # A running session counts its joined players, otherwise show the last one that ended
+            quiz.participant_count = live_participants.get(quiz.id) or quiz.last_session_size
+        quiz_count = Quiz.objects.filter(owner=request.user).count()
+    return render(request, 'QuizMania/home.html', {
+        'quizzes': quizzes,
+        'quiz_count': quiz_count,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+    })
 
 @login_required
 def delete_quiz(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code, owner=request.user)
     if request.method == 'POST':
+        # Its live rows and cached session are cleared by signals.clear_quiz_takers
         quiz.delete()
     return redirect('home')
 
+HISTORY_PAGE_SIZE = 50
+HISTORY_SESSION_LIMIT = 10
+
 @login_required
 def quiz_history_view(request, quiz_code):
     print(f"DEBUG: History Access - User: {request.user.username}, Quiz: {quiz_code}", flush=True)
@@ -442,17 +571,36 @@ def quiz_history_view(request, quiz_code):
         # For debugging, we'll let it 404 but now we know why.
     
     quiz = get_object_or_404(Quiz, code=quiz_code, owner=request.user)
-    history = QuizHistory.objects.filter(quiz=quiz).order_by('-completed_at')
-    print(f"DEBUG: Found {history.count()} history records", flush=True)
-    return render(request, 'QuizMania/quiz_history.html', {'quiz': quiz, 'history': history})
+    # Records are paged by completed_at on the (quiz, completed_at) index; the summary is aggregated in the database
+    history, next_cursor, prev_cursor = _keyset_page(QuizHistory.objects.filter(quiz=quiz), 'completed_at', request, HISTORY_PAGE_SIZE)
+    stats = history_stats(quiz)
+    print(f"DEBUG: Found {stats['attempts']} history records", flush=True)
+    return render(request, 'QuizMania/quiz_history.html', {
+        'quiz': quiz,
+        'history': history,
+        'stats': stats,
+        'sessions': session_summaries(quiz, HISTORY_SESSION_LIMIT),
+        'rollups': history_rollups(quiz),
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+    })
 
 @login_required
 def delete_quiz_history(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code, owner=request.user)
     if request.method == 'POST':
         QuizHistory.objects.filter(quiz=quiz).delete()
+        HistoryRollup.objects.filter(quiz=quiz).delete()
+        analytics.clear(quiz)
     return redirect('quiz_history', quiz_code=quiz_code)
 
+# Per-question analytics: percent correct, blanks and choice distribution.
+# Reads only the summaries end_session_view maintains, never the raw responses.
+@login_required
+def quiz_analytics_view(request, quiz_code):
+    quiz = get_object_or_404(Quiz, code=quiz_code, owner=request.user)
+    return render(request, 'QuizMania/quiz_analytics.html', {'quiz': quiz, 'report': analytics.question_report(quiz)})
+
 # Removed @login_required to allow Guests to check their answers
 def check_answers_view(request, quiz_code):
     quiz = get_object_or_404(Quiz, code=quiz_code)
@@ -478,23 +626,27 @@ def check_answers_view(request, quiz_code):
     if not quiz_taker:
         return redirect('home')
 
-    questions = quiz.questions.all()
-    user_responses = UserResponse.objects.filter(quiz_taker=quiz_taker)
-    response_map = {ur.question.id: ur.selected_choice for ur in user_responses}
-    
-    review_data = []
-    for q in questions:
-        selected_choice = response_map.get(q.id)
-        is_correct = False
-        if selected_choice and selected_choice.is_correct:
-            is_correct = True
-            
-        review_data.append({
-            'question': q,
-            'selected_choice': selected_choice,
-            'choices': q.choices.all(), 
-            'is_correct': is_correct
-        })
-        
-    return render(request, 'QuizMania/check_answers.html', {'quiz': quiz, 'review_data': review_data, 'score': quiz_taker.score})
+    if ingest.flush_taker(quiz_taker.id):
+        quiz_taker.refresh_from_db(fields=['score'])
+    def render_review():
+        # Constant number of queries: responses, questions, and all their choices
+        answer_key = get_answer_key(quiz)
+        response_map = dict(UserResponse.objects.filter(quiz_taker=quiz_taker).values_list('question_id', 'selected_choice_id'))
+
+        review_data = []
+        for q in quiz.questions.prefetch_related('choices'):
+            choices = q.choices.all()
+            selected_choice_id = response_map.get(q.id)
+            selected_choice = next((c for c in choices if c.id == selected_choice_id), None)
+
+            review_data.append({
+                'question': q,
+                'selected_choice': selected_choice,
+                'choices': choices,
+                'is_correct': answer_key.is_correct(q.id, selected_choice_id)
+            })
+        return render_to_string('QuizMania/partials/answer_review_partial.html', {'review_data': review_data})
+
+    review_html = get_review(quiz, quiz_taker.id, render_review)
+    return render(request, 'QuizMania/check_answers.html', {'quiz': quiz, 'review_html': review_html, 'score': quiz_taker.score})
 
@@ -0,0 +1,90 @@
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database: a million quizzes do not belong in memory
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.db import connection, reset_queries, transaction
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, generate_unique_code
+from QuizMania.codes import CodeAllocator, CODE_SPACE, encode, permute
+
+# Grows the quiz table to each size and measures the cost of one code: the
+# old random-code-plus-COUNT loop against the sequence allocator, and a full
+# Quiz.objects.create() with the allocator.
+TABLE_SIZES = [0, 10_000, 100_000, 1_000_000]
+SAMPLES = 2000
+INSERT_BATCH = 50_000
+
+
+def legacy_code():
+    while True:
+        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        if Quiz.objects.filter(code=code).count() == 0:
+            return code
+
+
+def grow_table(owner, current, target):
+    # Raw executemany: going through the ORM would make setup dominate the run.
+    # Filler codes are drawn from the top of the sequence so they cannot collide
+    # with the allocator, which starts at index 0.
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(current, target, INSERT_BATCH):
+            stop = min(start + INSERT_BATCH, target)
+            cursor.executemany(
+                "INSERT INTO QuizMania_quiz (owner_id, title, code, created_at, updated_at, last_session_size)"
+                " VALUES (%s, %s, %s, datetime('now'), datetime('now'), 0)",
+                [(owner.id, f"Filler {i}", encode(permute(CODE_SPACE - 1 - i))) for i in range(start, stop)],
+            )
+
+
+def timed(func, samples):
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for _ in range(samples):
+            func()
+        elapsed = time.perf_counter() - start
+    return elapsed / samples * 1e6, len(ctx.captured_queries) / samples
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    size = 0
+    print(f"{'quizzes':>9} | {'legacy':>18} | {'allocator':>18} | {'Quiz.create':>18}")
+    for target in TABLE_SIZES:
+        grow_table(owner, size, target)
+        size = target
+        assert Quiz.objects.count() == size
+
+        legacy_us, legacy_q = timed(legacy_code, SAMPLES)
+        # A fresh allocator per size so every run pays for its block reservations
+        fresh = CodeAllocator()
+        alloc_us, alloc_q = timed(fresh.allocate, SAMPLES)
+        create_us, create_q = timed(lambda: Quiz.objects.create(owner=owner, title="Bench"), SAMPLES // 10)
+        size += SAMPLES // 10
+
+        print(f"{target:>9} | {legacy_us:7.1f} us {legacy_q:4.2f} q | {alloc_us:7.1f} us {alloc_q:4.2f} q"
+              f" | {create_us:7.1f} us {create_q:4.2f} q")
+
+    codes = list(Quiz.objects.values_list('code', flat=True))
+    assert len(codes) == len(set(codes))
+    assert generate_unique_code() not in set(codes)
+    print(f"{len(codes)} quizzes, all codes distinct")
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    run()
@@ -0,0 +1,137 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so a live writer on another connection competes for the write lock
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from django.contrib.auth.models import User
+from QuizMania.models import (
+    ArchivedResponse, HistoryRollup, Question, QuestionSummary, Quiz, QuizHistory, QuizTaker,
+)
+
+# Compacts two years of history with compact_history while another thread
+# keeps writing to a live quiz, and checks that the rollups add up to the
+# records removed, recent records are untouched, and no live write waited
+# long on the write lock.
+QUIZZES = 20
+SESSIONS = 50          # per quiz, one every ~2 weeks
+PLAYERS = 60
+ANSWERS = 5            # archived responses per record
+MAX_WRITER_WAIT = 0.25  # seconds
+
+
+def build_history(owner):
+    now = timezone.now()
+    for q in range(QUIZZES):
+        quiz = Quiz.objects.create(owner=owner, title=f"History {q}")
+        questions = Question.objects.bulk_create([Question(quiz=quiz, text=f"Q{i}", marks=1) for i in range(ANSWERS)])
+        QuestionSummary.objects.bulk_create([QuestionSummary(question=question, attempts=1) for question in questions])
+        records = QuizHistory.objects.bulk_create([
+            QuizHistory(quiz=quiz, player_name=f"P{p}", score=(p * 7 + s) % 50,
+                        completed_at=now - timedelta(days=14 * s + 1, minutes=q))
+            for s in range(SESSIONS)
+            for p in range(PLAYERS)
+        ])
+        ArchivedResponse.objects.bulk_create(
+            [ArchivedResponse(history=record, question=question) for record in records for question in questions],
+            batch_size=5000,
+        )
+
+
+def expected_rollups(cutoff):
+    return {
+        (r['quiz'], r['month']): (r['attempts'], r['sessions'], r['total'], r['best'], r['lowest'])
+        for r in QuizHistory.objects.filter(completed_at__lt=cutoff)
+        .annotate(month=TruncMonth('completed_at'))
+        .values('quiz', 'month')
+        .annotate(attempts=Count('id'), sessions=Count('completed_at', distinct=True), total=Sum('score'),
+                  best=Max('score'), lowest=Min('score'))
+    }
+
+
+def live_writer(quiz, stop, waits):
+    # Stands in for players joining a live session: one short write transaction at a time
+    n = 0
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            QuizTaker.objects.create(quiz=quiz, alias=f"Live{n}")
+            waits.append(time.perf_counter() - start)
+            n += 1
+            time.sleep(0.005)
+    finally:
+        connection.close()
+
+
+def run():
+    owner = User.objects.create_user(username='retention_owner', password='password')
+    build_history(owner)
+    live_quiz = Quiz.objects.create(owner=owner, title="Live")
+    failures = 0
+
+    cutoff = timezone.now() - timedelta(days=365)
+    expected = expected_rollups(cutoff)
+    old = QuizHistory.objects.filter(completed_at__lt=cutoff).count()
+    recent = QuizHistory.objects.filter(completed_at__gte=cutoff).count()
+    recent_answers = ArchivedResponse.objects.filter(history__completed_at__gte=cutoff).count()
+    summaries = QuestionSummary.objects.count()
+
+    stop, waits = threading.Event(), []
+    writer = threading.Thread(target=live_writer, args=(live_quiz, stop, waits))
+    writer.start()
+    out = io.StringIO()
+    try:
+        # Two passes, so rollups of months that straddle the first cutoff get merged
+        call_command('compact_history', days=600, stdout=out, stderr=io.StringIO())
+        call_command('compact_history', days=365, stdout=out, stderr=io.StringIO())
+    finally:
+        stop.set()
+        writer.join()
+    print(out.getvalue().strip())
+    print(f"{old} old and {recent} recent records; live writer: {len(waits)} writes, "
+          f"slowest {max(waits) * 1000:.0f} ms")
+
+    actual = {
+        (r.quiz_id, r.period_start): (r.attempts, r.sessions, r.total_score, r.best_score, r.lowest_score)
+        for r in HistoryRollup.objects.filter(period='month')
+    }
+    if actual != expected:
+        print("FAIL: rollups do not add up to the compacted records")
+        failures += 1
+    if (QuizHistory.objects.filter(completed_at__lt=cutoff).exists()
+            or QuizHistory.objects.count() != recent
+            or ArchivedResponse.objects.count() != recent_answers):
+        print("FAIL: expected only the recent records and their answers to remain")
+        failures += 1
+    if QuestionSummary.objects.count() != summaries:
+        print("FAIL: compaction touched the question analytics")
+        failures += 1
+    if max(waits) > MAX_WRITER_WAIT:
+        print(f"FAIL: a live write waited more than {MAX_WRITER_WAIT * 1000:.0f} ms")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
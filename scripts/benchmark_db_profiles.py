@@ -0,0 +1,161 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import django
+
+# Join/submit throughput of the database profiles with several processes
+# writing to one database at once. The web process runs as a single worker,
+# so this overstates real contention; it checks that concurrent writers
+# (management commands, the write-behind flusher) wait instead of failing:
+#
+#   stock     SQLite as Django configures it by default (rollback journal,
+#             DEFERRED transactions, a new connection per request)
+#   tuned     the SQLite profile in QM/settings.py (WAL, busy_timeout,
+#             IMMEDIATE transactions)
+#   postgres  the PostgreSQL profile; only run with --postgres, using the
+#             POSTGRES_* environment variables and a throwaway test database
+#
+# Every participant joins as a guest and submits a full quiz. Requests that
+# fail (e.g. "database is locked") are counted as errors.
+#
+#   python scripts/benchmark_db_profiles.py [--workers 8] [--players 50] [--postgres]
+
+sys.path.append(os.getcwd())
+QUESTIONS = 10
+
+
+def setup(profile, name):
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'QM.settings'
+    os.environ['QUIZMANIA_DB'] = 'postgres' if profile == 'postgres' else 'sqlite'
+    from django.conf import settings
+    if profile == 'stock':
+        settings.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}}
+    else:
+        settings.DATABASES['default']['NAME'] = name
+    django.setup()
+
+
+def worker(profile, name, quiz_code, answers, index, players, start, results):
+    setup(profile, name)
+    from django.db import connection
+    from django.test import Client
+
+    start.wait()
+    joins = submits = errors = 0
+    for i in range(players):
+        client = Client(HTTP_HOST='localhost')
+        alias = f"W{index}P{i}"
+        try:
+            if client.post('/join_session/', {'code': quiz_code, 'username': alias}).status_code != 302:
+                errors += 1
+                continue
+            joins += 1
+            if client.post(f'/quiz/{quiz_code}/{alias}/', answers).status_code != 302:
+                errors += 1
+                continue
+            submits += 1
+        except Exception:
+            errors += 1
+            connection.close()
+    connection.close()
+    results.put((joins, submits, errors))
+
+
+def run_profile(profile, workers, players):
+    if profile == 'postgres':
+        os.environ['QUIZMANIA_DB'] = 'postgres'
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'QM.settings'
+        django.setup()
+        from django.db import connection
+        name = connection.creation.create_test_db(verbosity=0)
+    else:
+        name = os.path.join(tempfile.mkdtemp(), f'{profile}.sqlite3')
+        setup(profile, name)
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from QuizMania.models import Choice, Question, Quiz, QuizTaker, UserResponse
+
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    quiz = Quiz.objects.create(owner=owner, title=f"Profiles {profile}")
+    answers = {}
+    for i in range(QUESTIONS):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=1)
+        right = Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+        answers[f'question_{question.id}'] = right.id
+    connection.close()
+
+    context = multiprocessing.get_context('spawn')
+    start, results = context.Event(), context.Queue()
+    processes = [
+        context.Process(target=worker, args=(profile, name, quiz.code, answers, i, players, start, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(2)  # let every worker finish importing Django
+    started = time.perf_counter()
+    start.set()
+    totals = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    joins, submits, errors = (sum(t[i] for t in totals) for i in range(3))
+    stored = QuizTaker.objects.filter(quiz=quiz).count(), UserResponse.objects.filter(quiz_taker__quiz=quiz).count()
+    if profile == 'postgres':
+        connection.creation.destroy_test_db(name, verbosity=0)
+    return {
+        'profile': profile, 'joins': joins, 'submits': submits, 'errors': errors, 'seconds': elapsed,
+        'takers': stored[0], 'responses': stored[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--players', type=int, default=50, help="participants per worker")
+    parser.add_argument('--postgres', action='store_true')
+    parser.add_argument('--profile', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        # One profile per interpreter, so each gets its own settings
+        print(json.dumps(run_profile(args.profile, args.workers, args.players)))
+        return 0
+
+    profiles = ['stock', 'tuned'] + (['postgres'] if args.postgres else [])
+    failures = 0
+    for profile in profiles:
+        output = subprocess.run(
+            [sys.executable, __file__, '--profile', profile, '--workers', str(args.workers), '--players', str(args.players)],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+        if output.returncode or not lines:
+            print(f"{profile}: failed\n{output.stderr[-2000:]}")
+            failures += 1
+            continue
+        r = json.loads(lines[-1])
+        print(f"{r['profile']:>8}: {r['joins']} joins + {r['submits']} submits in {r['seconds']:.1f}s "
+              f"({(r['joins'] + r['submits']) / r['seconds']:.0f} requests/s), {r['errors']} errors")
+        if profile != 'stock':
+            expected = args.workers * args.players
+            if r['errors'] or r['takers'] != expected or r['responses'] != expected * QUESTIONS:
+                print(f"FAIL: {profile} lost requests under concurrent writers")
+                failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import time
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so the commit pays for its disk syncs as in production
+test_dir = tempfile.mkdtemp()
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(test_dir, 'benchmark.sqlite3')}
+# With QUIZMANIA_LIVE_DB_NAME set, the live tables get their own database and archiving crosses databases
+if 'live' in settings.DATABASES:
+    settings.DATABASES['live']['TEST'] = {'NAME': os.path.join(test_dir, 'live.sqlite3')}
+django.setup()
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania import archive
+from QuizMania.models import (
+    ArchivedResponse, Choice, Question, QuestionSummary, Quiz, QuizHistory, QuizTaker, UserResponse,
+)
+
+# Ends a large session through end_session_view and checks that takers and
+# every answer land in the archive tables and the live tables are empty; then
+# checks that a failure half-way leaves the session untouched.
+PARTICIPANTS = 2000
+QUESTIONS = 20
+
+
+def build_session(owner):
+    quiz = Quiz.objects.create(owner=owner, title="Archive")
+    questions = Question.objects.bulk_create([Question(quiz=quiz, text=f"Q{i}", marks=1) for i in range(QUESTIONS)])
+    choices = Choice.objects.bulk_create([
+        Choice(question=q, text=f"C{k}", is_correct=(k == 0)) for q in questions for k in range(4)
+    ])
+    takers = QuizTaker.objects.bulk_create([
+        QuizTaker(quiz=quiz, alias=f"Player{i}", score=i % (QUESTIONS + 1)) for i in range(PARTICIPANTS)
+    ])
+    UserResponse.objects.bulk_create(
+        [
+            UserResponse(quiz_taker=t, question=q, selected_choice=choices[j * 4 + (t.id % 4)])
+            for t in takers
+            for j, q in enumerate(questions)
+        ],
+        batch_size=5000,
+    )
+    return quiz
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(owner)
+    failures = 0
+    responses = PARTICIPANTS * QUESTIONS
+
+    # A failure after the first statement must roll the whole archive back
+    quiz = build_session(owner)
+    original = archive.analytics.record_session
+    archive.analytics.record_session = lambda *args, **kwargs: 1 / 0
+    try:
+        archive.archive_session(quiz)
+    except ZeroDivisionError:
+        pass
+    finally:
+        archive.analytics.record_session = original
+    if (QuizHistory.objects.filter(quiz=quiz).exists()
+            or QuizTaker.objects.filter(quiz=quiz).count() != PARTICIPANTS
+            or UserResponse.objects.filter(quiz_taker__quiz=quiz).count() != responses):
+        print("FAIL: a failed archive left the session half archived")
+        failures += 1
+
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        client.post(f'/quiz/{quiz.code}/end/')
+        elapsed = time.perf_counter() - start
+    print(f"end session: {PARTICIPANTS} participants, {responses} responses archived in "
+          f"{elapsed * 1000:.0f} ms, {len(ctx.captured_queries)} queries")
+
+    history = QuizHistory.objects.filter(quiz=quiz)
+    if (history.count() != PARTICIPANTS
+            or ArchivedResponse.objects.filter(history__quiz=quiz).count() != responses
+            or QuizTaker.objects.filter(quiz=quiz).exists()
+            or UserResponse.objects.filter(quiz_taker__quiz=quiz).exists()):
+        print("FAIL: archive is incomplete or the live tables were not cleared")
+        failures += 1
+    record = history.get(player_name="Player7")
+    if record.score != 7 or record.responses.count() != QUESTIONS:
+        print("FAIL: archived record lost its score or answers")
+        failures += 1
+    if set(QuestionSummary.objects.filter(question__quiz=quiz).values_list('attempts', flat=True)) != {PARTICIPANTS}:
+        print("FAIL: analytics summaries were not updated")
+        failures += 1
+    if elapsed >= 1:
+        print("FAIL: archiving took a second or more")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    for alias in settings.DATABASES:
+        connections[alias].creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,104 @@
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so page reads hit disk-backed indexes as in production
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.utils import timezone
+from django.contrib.auth.models import User
+from QuizMania.history import PERCENTILES, history_stats, session_summaries
+from QuizMania.models import Quiz, QuizHistory
+
+# History page of a long-running weekly quiz: page time and queries with
+# tens of thousands of records, summary statistics checked against Python's
+# statistics module, and a walk through every page of records.
+SESSIONS = 52
+PLAYERS_PER_SESSION = 600
+CURSOR = re.compile(r'href="\?(after|before)=([^"]+)"')
+
+
+def build(owner):
+    quiz = Quiz.objects.create(owner=owner, title="Weekly")
+    now = timezone.now()
+    rng = random.Random(7)
+    QuizHistory.objects.bulk_create(
+        [
+            QuizHistory(quiz=quiz, player_name=f"P{s}-{p}", score=rng.randint(0, 100), completed_at=now - timedelta(weeks=s))
+            for s in range(SESSIONS)
+            for p in range(PLAYERS_PER_SESSION)
+        ],
+        batch_size=5000,
+    )
+    return quiz
+
+
+def get(client, path):
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - start
+    return response, elapsed * 1000, len(ctx.captured_queries)
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    quiz = build(owner)
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(owner)
+    failures = 0
+    path = f'/quiz/{quiz.code}/history/'
+
+    response, ms, queries = get(client, path)
+    print(f"{SESSIONS * PLAYERS_PER_SESSION} records: history page {ms:.1f} ms, {queries} queries, {len(response.content) // 1024} KiB")
+
+    scores = sorted(QuizHistory.objects.filter(quiz=quiz).values_list('score', flat=True))
+    stats = history_stats(quiz)
+    expected = {p: scores[max(1, -(-p * len(scores) // 100)) - 1] for p in PERCENTILES}
+    if (stats['attempts'] != len(scores) or stats['sessions'] != SESSIONS
+            or abs(stats['mean'] - statistics.mean(scores)) > 1e-9
+            or stats['median'] != statistics.median(scores) or stats['percentiles'] != expected
+            or stats['top_scorer']['score'] != scores[-1]):
+        print(f"FAIL: statistics do not match: {stats}")
+        failures += 1
+    sessions = session_summaries(quiz)
+    if len(sessions) != SESSIONS or any(s['players'] != PLAYERS_PER_SESSION for s in sessions):
+        print("FAIL: records are not grouped by session")
+        failures += 1
+
+    seen, slowest = 0, 0
+    links = dict(CURSOR.findall(response.content.decode()))
+    seen += response.content.decode().count('hover:bg-white/5') - min(SESSIONS, 10)
+    while 'after' in links:
+        response, ms, queries = get(client, f"{path}?after={links['after']}")
+        slowest = max(slowest, ms)
+        links = dict(CURSOR.findall(response.content.decode()))
+        seen += response.content.decode().count('hover:bg-white/5') - min(SESSIONS, 10)
+    print(f"walked {seen} records, slowest page {slowest:.1f} ms")
+    if seen != len(scores):
+        print("FAIL: paging did not list every record once")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,105 @@
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import timedelta
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so page reads hit disk-backed indexes as in production
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.utils import timezone
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, QuizTaker, QuizHistory
+from QuizMania.views import HOME_PAGE_SIZE
+
+# Home page of an owner with thousands of quizzes: time and queries for the
+# first page and a deep page, a full walk through every page in both
+# directions, and the query plan of the page query.
+QUIZZES = 5000
+CURSOR = re.compile(r'href="\?(after|before)=([^"]+)"')
+
+
+def build(owner):
+    now = timezone.now()
+    quizzes = Quiz.objects.bulk_create([Quiz(owner=owner, title=f"Quiz {i}") for i in range(QUIZZES)])
+    # Spread updated_at (with ties) so ordering and cursors are exercised
+    for quiz in quizzes:
+        quiz.updated_at = now - timedelta(minutes=quiz.id // 3)
+    Quiz.objects.bulk_update(quizzes, ['updated_at'], batch_size=1000)
+    Question.objects.bulk_create([Question(quiz=q, text="Q", marks=5) for q in quizzes for _ in range(3)])
+    QuizTaker.objects.bulk_create([QuizTaker(quiz=q, alias="Guest") for q in quizzes[:50]])
+    QuizHistory.objects.bulk_create([QuizHistory(quiz=q, player_name="Old", score=1) for q in quizzes[:100]])
+
+
+def get(client, query=''):
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = client.get('/' + query)
+        elapsed = time.perf_counter() - start
+    links = dict(CURSOR.findall(response.content.decode()))
+    codes = re.findall(r'CODE:\s*(\w+)</span>', response.content.decode())
+    return elapsed * 1000, len(ctx.captured_queries), links, codes
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    build(owner)
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(owner)
+    failures = 0
+
+    ms, queries, links, codes = get(client)
+    print(f"first page: {ms:6.1f} ms, {queries} queries, {len(codes)} quizzes")
+
+    seen, pages, deep = list(codes), 1, None
+    while 'after' in links:
+        ms, queries, links, codes = get(client, f"?after={links['after']}")
+        seen += codes
+        last_page = codes
+        pages += 1
+        if pages == QUIZZES // HOME_PAGE_SIZE // 2:
+            deep = (ms, queries)
+    print(f"deep page:  {deep[0]:6.1f} ms, {deep[1]} queries (page {QUIZZES // HOME_PAGE_SIZE // 2} of {pages})")
+
+    expected = list(Quiz.objects.filter(owner=owner).order_by('-updated_at', '-id').values_list('code', flat=True))
+    if seen != expected:
+        print("FAIL: walking forward did not list every quiz exactly once in order")
+        failures += 1
+
+    back = []
+    while 'before' in links:
+        _, _, links, codes = get(client, f"?before={links['before']}")
+        back = codes + back
+    if back + last_page != expected:
+        print("FAIL: walking backwards did not return to the first page")
+        failures += 1
+
+    ordered = Quiz.objects.filter(owner=owner).order_by('-updated_at', '-id')
+    with connection.cursor() as cursor:
+        sql, params = ordered.values('id')[:HOME_PAGE_SIZE].query.sql_with_params()
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = ' | '.join(row[-1] for row in cursor.fetchall())
+    print(f"plan: {plan}")
+    if 'quiz_owner_updated_idx' not in plan or 'TEMP B-TREE' in plan:
+        print("FAIL: page query does not walk the (owner, updated_at) index")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
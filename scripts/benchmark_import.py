@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so commits pay for their disk syncs as in production
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+
+# Writes a question bank as JSON Lines, imports it with import_quizzes,
+# exports it again with export_quizzes and checks the round trip.
+QUIZZES = 5000
+QUESTIONS_PER_QUIZ = 10
+
+
+def write_bank(path):
+    with open(path, 'w', encoding='utf-8') as bank:
+        for i in range(QUIZZES):
+            bank.write(json.dumps({
+                'title': f"Bank quiz {i}",
+                'owner': 'bench_owner',
+                'questions': [
+                    {
+                        'text': f"Question {i}.{j}",
+                        'marks': 10,
+                        'duration': 5,
+                        'explanation': "Because.",
+                        'choices': [{'text': f"Option {k}", 'is_correct': k == 1} for k in range(1, 5)],
+                    }
+                    for j in range(QUESTIONS_PER_QUIZ)
+                ],
+            }) + '\n')
+
+
+def run():
+    User.objects.create_user(username='bench_owner', password='password')
+    workdir = tempfile.mkdtemp()
+    bank, export = os.path.join(workdir, 'bank.jsonl'), os.path.join(workdir, 'export.jsonl')
+    write_bank(bank)
+    total = QUIZZES * QUESTIONS_PER_QUIZ
+
+    start = time.perf_counter()
+    call_command('import_quizzes', bank, stderr=open(os.devnull, 'w'))
+    import_s = time.perf_counter() - start
+    assert Quiz.objects.count() == QUIZZES
+    assert Question.objects.count() == total
+    assert Choice.objects.count() == total * 4
+
+    start = time.perf_counter()
+    call_command('export_quizzes', export, stdout=open(os.devnull, 'w'))
+    export_s = time.perf_counter() - start
+
+    with open(bank, encoding='utf-8') as a, open(export, encoding='utf-8') as b:
+        for original, exported in zip(a, b):
+            exported = json.loads(exported)
+            del exported['code']
+            assert json.loads(original) == exported
+
+    print(f"import: {total} questions in {import_s:.1f}s ({total / import_s:.0f} questions/s)")
+    print(f"export: {total} questions in {export_s:.1f}s ({total / export_s:.0f} questions/s)")
+    print("round trip OK")
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    run()
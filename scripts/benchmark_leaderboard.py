@@ -0,0 +1,58 @@
+import os
+import sys
+import random
+import timeit
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, QuizTaker
+from QuizMania import live
+
+# Compares the old results_view query (ORDER BY score on every request) with
+# the live leaderboard index. Runs against a throwaway test database.
+ROOM_SIZES = [30, 300, 1000]
+READS = 500
+
+
+def bench(room_size):
+    owner, _ = User.objects.get_or_create(username='bench_owner')
+    quiz = Quiz.objects.create(owner=owner, title=f"Leaderboard {room_size}")
+    QuizTaker.objects.bulk_create([
+        QuizTaker(quiz=quiz, alias=f"Player{i}", score=random.randint(0, 100))
+        for i in range(room_size)
+    ])
+    session = live.get_session(quiz.code)
+
+    # Same answer from both paths
+    expected = list(QuizTaker.objects.filter(quiz=quiz).order_by('-score', 'id').values_list('alias', 'score')[:5])
+    actual = [(t.alias, t.score) for t in session.top(5)]
+    assert expected == actual, (expected, actual)
+
+    query = timeit.timeit(lambda: list(QuizTaker.objects.filter(quiz=quiz).order_by('-score')[:5]), number=READS)
+    index = timeit.timeit(lambda: session.top(5), number=READS)
+
+    takers = list(QuizTaker.objects.filter(quiz=quiz))
+    update = timeit.timeit(
+        lambda: session.set_taker(random.choice(takers).id, 'x', random.randint(0, 100)),
+        number=READS,
+    )
+
+    print(f"{room_size:>6} takers | query top-5: {query / READS * 1e6:8.1f} us"
+          f" | index top-5: {index / READS * 1e6:6.1f} us"
+          f" | index update: {update / READS * 1e6:6.1f} us"
+          f" | speedup x{query / index:.0f}")
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    print(f"--- Top-5 leaderboard, {READS} reads per room ---")
+    for size in ROOM_SIZES:
+        bench(size)
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import time
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+from django.conf import settings
+# File-backed test database, so autocommitted writes pay for their disk syncs as in production
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')}
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+
+# Posts start_session forms of each size through the real view and compares
+# against the old one-create()-per-row approach.
+QUIZ_SIZES = [10, 100, 200]
+RUNS = 5
+
+
+def quiz_form(num_questions):
+    data = {'title': f"Bench {num_questions}"}
+    for i in range(1, num_questions + 1):
+        data[f'question_text_{i}'] = f"Question {i}"
+        data[f'marks_{i}'] = '10'
+        data[f'duration_{i}'] = '5'
+        data[f'answer_{i}'] = "Because."
+        data[f'correct_option_{i}'] = '1'
+        for k in range(1, 5):
+            data[f'option_{k}_{i}'] = f"Option {k}"
+    return data
+
+
+def create_per_row(owner, num_questions):
+    quiz = Quiz.objects.create(title=f"Legacy {num_questions}", owner=owner)
+    for i in range(num_questions):
+        question = Question.objects.create(quiz=quiz, text=f"Question {i}", marks=10, duration=5, explanation="Because.")
+        for k in range(1, 5):
+            Choice.objects.create(question=question, text=f"Option {k}", is_correct=(k == 1))
+
+
+def timed(func):
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    return elapsed, len(ctx.captured_queries)
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(owner)
+
+    for size in QUIZ_SIZES:
+        form = quiz_form(size)
+        legacy = [timed(lambda: create_per_row(owner, size)) for _ in range(RUNS)]
+        bulk = [timed(lambda: client.post('/start_session/', form)) for _ in range(RUNS)]
+
+        quiz = Quiz.objects.filter(title=f"Bench {size}").latest('id')
+        assert quiz.questions.count() == size
+        assert Choice.objects.filter(question__quiz=quiz).count() == size * 4
+
+        legacy_ms = min(t for t, _ in legacy) * 1000
+        bulk_ms = min(t for t, _ in bulk) * 1000
+        print(f"{size:>4} questions | per-row: {legacy_ms:8.1f} ms {legacy[0][1]:>5} queries"
+              f" | start_session (bulk): {bulk_ms:7.1f} ms {bulk[0][1]:>3} queries")
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    run()
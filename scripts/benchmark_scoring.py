@@ -0,0 +1,78 @@
+import os
+import sys
+import timeit
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+from QuizMania import scoring
+
+# Per-submission grading cost (no writes) for a quiz of each size:
+#   per-question: the original loop, one Choice lookup per question
+#   uncached key: compiling the answer key on every submission
+#   cached key:   the compiled key served from the per-process cache
+QUIZ_SIZES = [10, 50, 200]
+RUNS = 200
+
+
+def build_quiz(owner, num_questions):
+    quiz = Quiz.objects.create(owner=owner, title=f"Bench {num_questions}")
+    questions = Question.objects.bulk_create([
+        Question(quiz=quiz, text=f"Q{i}", marks=1) for i in range(num_questions)
+    ])
+    choices = Choice.objects.bulk_create([
+        Choice(question=q, text=f"Option {k}", is_correct=(k == 0)) for q in questions for k in range(4)
+    ])
+    answers = {c.question_id: c.id for c in choices if c.is_correct}
+    return quiz, answers
+
+
+def grade_per_question(quiz, answers):
+    score = 0
+    for question in quiz.questions.all():
+        choice = Choice.objects.filter(id=answers.get(question.id), question=question).first()
+        if choice and choice.is_correct:
+            score += question.marks
+    return score
+
+
+def grade_with_key(key, answers):
+    score = 0
+    for question_id, choice_id in answers.items():
+        if key.is_correct(question_id, choice_id):
+            score += key.questions[question_id].marks
+    return score
+
+
+def measure(label, func, size):
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        score = func()
+    assert score == size, (label, score)
+    seconds = timeit.timeit(func, number=RUNS) / RUNS
+    print(f"    {label:<14} {seconds * 1e6:9.1f} us  {len(ctx.captured_queries):>4} queries")
+
+
+def run():
+    owner = User.objects.create_user(username='bench_owner', password='password')
+    for size in QUIZ_SIZES:
+        quiz, answers = build_quiz(owner, size)
+        compile_key = scoring._compile_answer_key.__wrapped__
+        print(f"--- {size} questions ---")
+        measure("per-question", lambda: grade_per_question(quiz, answers), size)
+        measure("uncached key", lambda: grade_with_key(compile_key(quiz.id, quiz.updated_at), answers), size)
+        scoring.get_answer_key(quiz)
+        measure("cached key", lambda: grade_with_key(scoring.get_answer_key(quiz), answers), size)
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    run()
@@ -0,0 +1,310 @@
+"""
+Load test for a live classroom.
+
+Simulates N guests who join a quiz, poll the live endpoints, answer every
+question and submit, while the host keeps the dashboard and participant feed
+open. The host logs in and loads the dashboard before the guests start, keeps
+polling until the last guest has submitted, then ends the session (in remote
+mode too, which archives the load-test guests). Reports p50/p95/p99 latency,
+throughput, error rate and (in-process mode) database queries per route, and
+exits non-zero if the host made no successful requests.
+
+In-process mode (default) builds a throwaway quiz in a temporary SQLite
+database and drives the real URL routes through Django's test Client, one
+thread per participant:
+
+    python scripts/load_test.py --guests 300 --questions 20
+
+Remote mode sends real HTTP requests to a running server instead. Query
+counts are not available there:
+
+    python scripts/load_test.py --url http://127.0.0.1:8000 --quiz ABC123 \\
+        --host-username teacher --host-password secret --guests 300
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+
+
+class Stats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = defaultdict(int)
+
+    def record(self, route, seconds, ok, queries=0):
+        with self.lock:
+            self.latencies[route].append(seconds)
+            self.queries[route] += queries
+            if not ok:
+                self.errors[route] += 1
+
+    def report(self, wall_seconds, with_queries):
+        def pct(values, p):
+            return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+        header = f"{'route':<26}{'reqs':>7}{'err%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        if with_queries:
+            header += f"{'q/req':>8}"
+        print(header)
+        print('-' * len(header))
+
+        total = errors = 0
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            total += len(values)
+            errors += self.errors[route]
+            line = (f"{route:<26}{len(values):>7}{self.errors[route] / len(values) * 100:>6.1f}%"
+                    f"{pct(values, 50):>9.1f}{pct(values, 95):>9.1f}{pct(values, 99):>9.1f}")
+            if with_queries:
+                line += f"{self.queries[route] / len(values):>8.1f}"
+            print(line)
+
+        print('-' * len(header))
+        print(f"{total} requests in {wall_seconds:.2f}s = {total / wall_seconds:.1f} req/s, "
+              f"error rate {errors / max(total, 1) * 100:.2f}%")
+
+
+class InProcessUser:
+    """
+    One participant driving the URL routes through Django's test Client.
+    """
+
+    def __init__(self, stats):
+        from django.test import Client
+        self.client = Client(HTTP_HOST='localhost')
+        self.stats = stats
+
+    def request(self, method, path, data=None):
+        from django.db import connection
+        from django.urls import resolve
+
+        count = [0]
+
+        def counter(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        route = resolve(path).url_name
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = getattr(self.client, method)(path, data or {})
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.stats.record(route, time.perf_counter() - start, ok, count[0])
+        return response
+
+    def login(self, username, password):
+        return self.client.login(username=username, password=password)
+
+    def close(self):
+        from django.db import connection
+        connection.close()
+
+
+class RemoteUser:
+    """
+    One participant sending real HTTP requests to a running server.
+    """
+
+    def __init__(self, stats, base_url):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+
+    def request(self, method, path, data=None):
+        from django.urls import resolve
+
+        headers = {'X-CSRFToken': self.session.cookies.get('csrftoken', ''), 'Referer': self.base_url + path}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method.upper(), self.base_url + path, data=data, headers=headers, allow_redirects=False)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.stats.record(resolve(path).url_name, time.perf_counter() - start, ok)
+        return response
+
+    def login(self, username, password):
+        self.request('get', '/login/')
+        response = self.request('post', '/login/', {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken', ''),
+        })
+        return response is not None and response.status_code == 302
+
+    def close(self):
+        self.session.close()
+
+
+def guest(make_user, quiz_code, questions, index, args):
+    user = make_user()
+    alias = f"LoadGuest{index}"
+    try:
+        user.request('get', '/join_session/')
+        response = user.request('post', '/join_session/', {'code': quiz_code, 'username': alias})
+        if response is None or response.status_code != 302:
+            return
+        quiz_path = f'/quiz/{quiz_code}/{alias}/'
+        user.request('get', quiz_path)
+
+        answers = {'finalize': '1'} if args.incremental else {}
+        for question_id, choice_id in questions:
+            if args.incremental:
+                user.request('post', quiz_path + 'answer/', {'question_id': question_id, 'choice_id': choice_id})
+            answers[f'question_{question_id}'] = choice_id
+
+        for _ in range(args.polls):
+            user.request('get', f'/api/quiz/{quiz_code}/live_scoreboard/')
+            user.request('get', f'/api/quiz/{quiz_code}/live_count/')
+            time.sleep(args.think)
+
+        user.request('post', quiz_path, answers)
+        user.request('get', f'/quiz/{quiz_code}/results/')
+    finally:
+        user.close()
+
+
+def host(make_user, quiz_code, args, ready, guests_done, requests_made):
+    # Logs in and completes one round before the guests start (ready), keeps
+    # polling while they play, then ends the session and polls once more
+    user = make_user()
+
+    def poll():
+        for path in (f'/quiz/{quiz_code}/', f'/api/quiz/{quiz_code}/snapshot/',
+                     f'/api/quiz/{quiz_code}/live_participants_list/'):
+            response = user.request('get', path)
+            if response is not None and response.status_code < 400:
+                requests_made[0] += 1
+
+    try:
+        if not user.login(args.host_username, args.host_password):
+            print("WARNING: host login failed, dashboard traffic will be errors")
+        poll()
+        ready.set()
+        while not guests_done.is_set():
+            guests_done.wait(max(args.think, 0.05))
+            poll()
+        response = user.request('post', f'/quiz/{quiz_code}/end/')
+        if response is not None and response.status_code < 400:
+            requests_made[0] += 1
+        poll()
+    finally:
+        ready.set()
+        user.close()
+
+
+def setup_in_process(args):
+    from django.conf import settings
+    # File-backed test database so every participant thread shares it
+    settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(tempfile.mkdtemp(), 'load_test.sqlite3')}
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.contrib.auth.models import User
+    from QuizMania.models import Quiz, Question, Choice
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    User.objects.create_user(username=args.host_username, password=args.host_password)
+    owner = User.objects.get(username=args.host_username)
+    quiz = Quiz.objects.create(owner=owner, title="Load Test")
+    questions = Question.objects.bulk_create([
+        Question(quiz=quiz, text=f"Question {i}", marks=1) for i in range(args.questions)
+    ])
+    choices = Choice.objects.bulk_create([
+        Choice(question=q, text=f"Option {k}", is_correct=(k == 0)) for q in questions for k in range(4)
+    ])
+    connection.close()
+    return quiz.code, [(c.question_id, c.id) for c in choices if c.is_correct]
+
+
+def setup_remote(args):
+    django.setup()
+    user = RemoteUser(Stats(), args.url)
+    if not user.login(args.host_username, args.host_password):
+        sys.exit("Host login failed; remote mode needs --host-username/--host-password of the quiz owner")
+
+    # The owner may read the quiz payload; take each question's correct choice from it
+    payload = user.request('get', f'/quiz/{args.quiz}/preview/payload/').json()
+    questions = [
+        (question['id'], choice['id'])
+        for question in payload
+        for choice in question['choices']
+        if choice['is_correct']
+    ]
+    user.close()
+    return args.quiz, questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guests', type=int, default=50, help="concurrent participants")
+    parser.add_argument('--questions', type=int, default=10, help="questions in the generated quiz (in-process)")
+    parser.add_argument('--polls', type=int, default=5, help="live endpoint polls per guest")
+    parser.add_argument('--think', type=float, default=0.0, help="seconds between a guest's polls")
+    parser.add_argument('--incremental', action='store_true', help="send answers one by one before the final submit")
+    parser.add_argument('--url', help="base URL of a running server (remote mode)")
+    parser.add_argument('--quiz', help="quiz code to use in remote mode")
+    parser.add_argument('--host-username', default='load_host')
+    parser.add_argument('--host-password', default='load-test-password')
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.quiz:
+            parser.error("--quiz is required with --url")
+        quiz_code, questions = setup_remote(args)
+    else:
+        quiz_code, questions = setup_in_process(args)
+
+    stats = Stats()
+    if args.url:
+        def make_user():
+            return RemoteUser(stats, args.url)
+    else:
+        def make_user():
+            return InProcessUser(stats)
+
+    print(f"--- {args.guests} guests, {len(questions)} questions, {args.polls} polls each, quiz {quiz_code} ---")
+    ready, guests_done, host_requests = threading.Event(), threading.Event(), [0]
+    host_thread = threading.Thread(target=host, args=(make_user, quiz_code, args, ready, guests_done, host_requests))
+    host_thread.start()
+    ready.wait()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.guests) as pool:
+        futures = [pool.submit(guest, make_user, quiz_code, questions, i, args) for i in range(args.guests)]
+        for future in futures:
+            future.result()
+    guests_done.set()
+    host_thread.join()
+    stats.report(time.perf_counter() - started, with_queries=not args.url)
+
+    # A run without host traffic did not measure the dashboard endpoints
+    print(f"host: {host_requests[0]} successful requests")
+    if not host_requests[0]:
+        print("FAIL: the host made no successful requests")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
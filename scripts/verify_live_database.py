@@ -0,0 +1,185 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import django
+
+# Setup Django with the live tables in their own database (see QuizMania/routers.py)
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+os.environ['QUIZMANIA_DB'] = 'sqlite'
+os.environ['QUIZMANIA_LIVE_DB_NAME'] = 'live.sqlite3'
+from django.conf import settings
+# File-backed test databases, so a writer holding one database's lock is a real lock
+test_dir = tempfile.mkdtemp()
+settings.DATABASES['default']['TEST'] = {'NAME': os.path.join(test_dir, 'default.sqlite3')}
+settings.DATABASES['live']['TEST'] = {'NAME': os.path.join(test_dir, 'live.sqlite3')}
+django.setup()
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.contrib.auth.models import User
+from QuizMania import analytics, archive
+from QuizMania.models import ArchivedResponse, Choice, Question, QuestionSummary, Quiz, QuizHistory, QuizTaker, UserResponse
+
+# Checks for the separate live database: joins and answers land only in it,
+# a writer holding its lock does not block quiz saves or history reads, and
+# ending a session archives every taker exactly once, including when it
+# fails before or after the history side commits, and deleting a quiz or a
+# user leaves nothing behind in the live database.
+PLAYERS = 30
+QUESTIONS = 4
+LOCK_SECONDS = 1.0
+
+
+def build_quiz(owner, title):
+    quiz = Quiz.objects.create(owner=owner, title=title)
+    answers = {}
+    for i in range(QUESTIONS):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=1)
+        right = Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+        answers[f'question_{question.id}'] = right.id
+    return quiz, answers
+
+
+def play(quiz, answers):
+    for p in range(PLAYERS):
+        client = Client(HTTP_HOST='localhost')
+        client.post('/join_session/', {'code': quiz.code, 'username': f"P{p}"})
+        client.post(f'/quiz/{quiz.code}/P{p}/', answers)
+
+
+def end_session(host, quiz):
+    try:
+        host.post(f'/quiz/{quiz.code}/end/')
+        return None
+    except RuntimeError as e:
+        return e
+
+
+def fail(*args, **kwargs):
+    raise RuntimeError("injected failure")
+
+
+def hold_live_lock(quiz, locked):
+    # A submit storm in miniature: one long write transaction on the live database
+    with transaction.atomic(using='live'):
+        QuizTaker.objects.filter(quiz=quiz).update(score=F('score'))
+        locked.set()
+        time.sleep(LOCK_SECONDS)
+    connections.close_all()
+
+
+def run():
+    owner = User.objects.create_user(username='live_owner', password='password')
+    host = Client(HTTP_HOST='localhost')
+    host.force_login(owner)
+    failures = 0
+    quiz, answers = build_quiz(owner, "Split")
+    play(quiz, answers)
+
+    takers = QuizTaker.objects.filter(quiz=quiz).count()
+    responses = UserResponse.objects.filter(quiz_taker__quiz=quiz).count()
+    with connections['default'].cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM "{QuizTaker._meta.db_table}"')
+        in_default = cursor.fetchone()[0]
+    print(f"live database: {takers} takers, {responses} responses; default database: {in_default} takers")
+    if takers != PLAYERS or responses != PLAYERS * QUESTIONS or in_default:
+        print("FAIL: live rows are not (only) in the live database")
+        failures += 1
+    home = host.get('/')
+    if home.context['quizzes'][0].participant_count != PLAYERS:
+        print("FAIL: home page does not count the live participants")
+        failures += 1
+
+    # Authoring and history reads while the live database is write-locked
+    locked = threading.Event()
+    holder = threading.Thread(target=hold_live_lock, args=(quiz, locked))
+    holder.start()
+    locked.wait()
+    start = time.perf_counter()
+    quiz.title = "Split (edited)"
+    quiz.save()
+    host.get(f'/quiz/{quiz.code}/history/')
+    blocked = time.perf_counter() - start
+    holder.join()
+    print(f"quiz save + history page while live is locked for {LOCK_SECONDS:.0f}s: {blocked * 1000:.0f} ms")
+    if blocked > LOCK_SECONDS / 2:
+        print("FAIL: the live database's write lock blocked the default database")
+        failures += 1
+
+    # 1. Failure before the history side commits: nothing changes
+    original = analytics.record_session
+    analytics.record_session = fail
+    error = end_session(host, quiz)
+    analytics.record_session = original
+    if (error is None or QuizHistory.objects.filter(quiz=quiz).exists()
+            or QuizTaker.objects.filter(quiz=quiz).count() != PLAYERS):
+        print("FAIL: a failed copy changed the history or the live tables")
+        failures += 1
+
+    # 2. Failure after the history side committed: copies are kept, live rows stay
+    original = archive._clear_live
+    archive._clear_live = fail
+    error = end_session(host, quiz)
+    archive._clear_live = original
+    if (error is None or QuizHistory.objects.filter(quiz=quiz).count() != PLAYERS
+            or QuizTaker.objects.filter(quiz=quiz).count() != PLAYERS):
+        print("FAIL: expected archived copies and untouched live rows after a failed clear")
+        failures += 1
+
+    # 3. Ending again only clears what was already archived
+    end_session(host, quiz)
+    attempts = set(QuestionSummary.objects.filter(question__quiz=quiz).values_list('attempts', flat=True))
+    archived = ArchivedResponse.objects.filter(history__quiz=quiz).count()
+    print(f"after retry: {QuizHistory.objects.filter(quiz=quiz).count()} history records, {archived} archived "
+          f"responses, {QuizTaker.objects.filter(quiz=quiz).count()} live takers, analytics attempts {attempts}")
+    if (QuizHistory.objects.filter(quiz=quiz).count() != PLAYERS or archived != PLAYERS * QUESTIONS
+            or QuizTaker.objects.filter(quiz=quiz).exists() or UserResponse.objects.filter(quiz_taker__quiz=quiz).exists()
+            or attempts != {PLAYERS}):
+        print("FAIL: the session was not archived exactly once")
+        failures += 1
+
+    # A question deleted mid-session, and deleting a quiz with players still in it
+    other, answers = build_quiz(owner, "Edited mid-session")
+    play(other, answers)
+    # As an edit would: the question goes and the quiz is saved, which renews its answer key
+    other.questions.order_by('id').first().delete()
+    other.save()
+    if end_session(host, other) or ArchivedResponse.objects.filter(history__quiz=other).count() != PLAYERS * (QUESTIONS - 1):
+        print("FAIL: archiving after a question was deleted")
+        failures += 1
+    play(other, answers)
+    host.post(f'/quiz/{other.code}/delete/')
+    if QuizTaker.objects.filter(quiz_id=other.id).exists() or UserResponse.objects.filter(quiz_taker__quiz_id=other.id).exists():
+        print("FAIL: deleting a quiz left its rows in the live database")
+        failures += 1
+
+    # Deleting an account that is taking a quiz, and one whose quiz has players in it
+    student = User.objects.create_user(username='live_student', password='password')
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(student)
+    client.post('/join_session/', {'code': quiz.code, 'username': "Student"})
+    client.post(f'/quiz/{quiz.code}/Student/', answers)
+    third, answers = build_quiz(student, "Owned by a deleted account")
+    play(third, answers)
+    student_id = student.id
+    student.delete()
+    if (QuizTaker.objects.filter(user_id=student_id).exists() or QuizTaker.objects.filter(quiz_id=third.id).exists()
+            or UserResponse.objects.filter(quiz_taker__quiz_id=third.id).exists()):
+        print("FAIL: deleting a user left their rows in the live database")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connections['default'].creation.create_test_db(verbosity=0)
+    connections['live'].creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania import microcache
+from QuizMania.models import Quiz, Question, Choice
+
+# Checks for the micro-cached live and results pages (QuizMania/microcache.py).
+# A room polling the same endpoint within one interval is answered from the
+# cache after the first request, the quiz owner's results are never cached,
+# revalidation still works on a hit, new data shows up once the interval is
+# over, and the hit/miss counters are only visible to staff.
+PLAYERS = 20
+
+
+def poll(clients, path):
+    with CaptureQueriesContext(connection) as ctx:
+        responses = [client.get(path) for client in clients]
+    return [r.get('X-Cache') for r in responses], responses, len(ctx.captured_queries)
+
+
+def run():
+    settings.QUIZMANIA_MICROCACHE_TIMEOUT = 1
+    cache.clear()
+    owner = User.objects.create_user(username='cache_owner', password='password')
+    host = Client(HTTP_HOST='localhost')
+    host.force_login(owner)
+    failures = 0
+
+    quiz = Quiz.objects.create(owner=owner, title="Micro-cache")
+    question = Question.objects.create(quiz=quiz, text="Q", marks=1)
+    right = Choice.objects.create(question=question, text="Right", is_correct=True)
+    Choice.objects.create(question=question, text="Wrong", is_correct=False)
+    players = []
+    for p in range(PLAYERS):
+        client = Client(HTTP_HOST='localhost')
+        client.post('/join_session/', {'code': quiz.code, 'username': f"P{p}"})
+        players.append(client)
+
+    # A room polling within one interval: one render, every other request is a hit
+    for path in (f'/api/quiz/{quiz.code}/live_count/', f'/api/quiz/{quiz.code}/live_scoreboard/',
+                 f'/quiz/{quiz.code}/live_scoreboard/', f'/quiz/{quiz.code}/results/'):
+        outcomes, responses, queries = poll(players, path)
+        print(f"{path}: {outcomes.count('MISS')} miss, {outcomes.count('HIT')} hits, {queries} queries")
+        if outcomes != ['MISS'] + ['HIT'] * (PLAYERS - 1) or len({r.content for r in responses}) != 1:
+            print(f"FAIL: {path} was not served from the micro-cache")
+            failures += 1
+
+    # The owner sees every taker, so their results page is never cached
+    outcomes, _, _ = poll([host, host], f'/quiz/{quiz.code}/results/')
+    if outcomes != [None, None]:
+        print("FAIL: the owner's results page was micro-cached")
+        failures += 1
+
+    # A hit keeps the ETag it was served with
+    count_path = f'/api/quiz/{quiz.code}/live_count/'
+    etag = players[0].get(count_path)['ETag']
+    revalidated = players[1].get(count_path, HTTP_IF_NONE_MATCH=etag)
+    if revalidated.status_code != 304 or revalidated['X-Cache'] != 'HIT':
+        print(f"FAIL: revalidating on a hit returned {revalidated.status_code}")
+        failures += 1
+
+    # A new player shows up once the interval is over
+    late = Client(HTTP_HOST='localhost')
+    late.post('/join_session/', {'code': quiz.code, 'username': "Late"})
+    late.post(f'/quiz/{quiz.code}/Late/', {f'question_{question.id}': right.id})
+    stale = players[0].get(count_path).json()['live_count']
+    time.sleep(settings.QUIZMANIA_MICROCACHE_TIMEOUT + 0.1)
+    fresh = players[0].get(count_path, HTTP_IF_NONE_MATCH=etag)
+    print(f"live count within the interval: {stale}, after it: {fresh.json()['live_count']}")
+    if fresh.status_code != 200 or fresh.json()['live_count'] != PLAYERS + 1:
+        print("FAIL: the micro-cache served data older than its timeout")
+        failures += 1
+
+    # Counters, for staff only
+    if host.get('/api/cache_stats/').status_code != 403:
+        print("FAIL: cache statistics are visible to non-staff users")
+        failures += 1
+    owner.is_staff = True
+    owner.save()
+    stats = host.get('/api/cache_stats/').json()
+    print(f"stats: {stats}")
+    # Each poll above was one miss and PLAYERS - 1 hits; live_count then had three more hits and one more miss
+    expected = {name: {'hits': PLAYERS - 1, 'misses': 1} for name in ('live_scoreboard', 'live_scoreboard_view', 'results_view')}
+    expected['live_count'] = {'hits': PLAYERS + 2, 'misses': 2}
+    if stats != expected or stats != microcache.stats():
+        print("FAIL: hit/miss counters do not match the requests made")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
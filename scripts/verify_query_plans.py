@@ -0,0 +1,118 @@
+import os
+import re
+import sys
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania import live
+from QuizMania.models import Quiz, Question, Choice, QuizTaker
+
+# Runs EXPLAIN QUERY PLAN on every statement issued by join_session,
+# quiz_view, quiz_answer and the live endpoints, and fails if any of them
+# reads a table with a full scan instead of an index search. Also checks
+# that the unique constraints reject a second taker with the same alias or
+# account and a second answer to the same question.
+PLAYERS = 200
+# "SCAN <table>" is a full table (or full index) scan; scans of subquery results are fine
+FULL_SCAN = re.compile(r'^SCAN (?!\(|CONSTANT ROW)(\S+)')
+SKIPPED = ('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT')
+
+
+def build_quiz(owner):
+    quiz = Quiz.objects.create(owner=owner, title="Plans")
+    for i in range(5):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=1)
+        Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+    QuizTaker.objects.bulk_create([QuizTaker(quiz=quiz, alias=f"Bot{i}", score=i % 5) for i in range(PLAYERS)])
+    return quiz
+
+
+def scans(captured):
+    found = set()
+    with connection.cursor() as cursor:
+        for query in captured:
+            sql = query['sql']
+            if sql.startswith(SKIPPED):
+                continue
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            for row in cursor.fetchall():
+                match = FULL_SCAN.match(row[-1])
+                if match:
+                    found.add((match.group(1), sql[:120]))
+    return found
+
+
+def run():
+    owner = User.objects.create_user(username='plans_owner', password='password')
+    student = User.objects.create_user(username='plans_student', password='password')
+    quiz = build_quiz(owner)
+    question = quiz.questions.order_by('id').first()
+    choice = question.choices.get(is_correct=True)
+    failures = 0
+
+    host = Client(HTTP_HOST='localhost')
+    host.force_login(owner)
+    guest = Client(HTTP_HOST='localhost')
+    member = Client(HTTP_HOST='localhost')
+    member.force_login(student)
+
+    requests = [
+        ('join_session (guest)', lambda: guest.post('/join_session/', {'code': quiz.code, 'username': 'Guest1'})),
+        ('join_session (account)', lambda: member.post('/join_session/', {'code': quiz.code, 'username': 'Member'})),
+        ('quiz_view (guest)', lambda: guest.get(f'/quiz/{quiz.code}/Guest1/')),
+        ('quiz_view (account)', lambda: member.get(f'/quiz/{quiz.code}/Member/')),
+        ('quiz_answer', lambda: guest.post(f'/quiz/{quiz.code}/Guest1/answer/',
+                                           {'question_id': question.id, 'choice_id': choice.id})),
+        ('quiz_view submit', lambda: member.post(f'/quiz/{quiz.code}/Member/',
+                                                 {f'question_{question.id}': choice.id})),
+        # Drop the in-memory state so the next live request rebuilds it from QuizTaker
+        ('live rebuild', lambda: (live.forget(quiz.code), host.get(f'/api/quiz/{quiz.code}/live_count/'))),
+        ('live_scoreboard', lambda: host.get(f'/api/quiz/{quiz.code}/live_scoreboard/')),
+        ('live_snapshot', lambda: host.get(f'/api/quiz/{quiz.code}/snapshot/')),
+        ('live_participants_list', lambda: host.get(f'/api/quiz/{quiz.code}/live_participants_list/')),
+        ('live_scoreboard_delta', lambda: host.get(f'/api/quiz/{quiz.code}/live_scoreboard/delta/?since=0')),
+        ('results_view', lambda: guest.get(f'/quiz/{quiz.code}/results/')),
+        ('quiz_master_dashboard', lambda: host.get(f'/quiz/{quiz.code}/')),
+    ]
+    for name, request in requests:
+        with CaptureQueriesContext(connection) as ctx:
+            request()
+        found = scans(ctx.captured_queries)
+        print(f"{name}: {len(ctx.captured_queries)} queries, {len(found)} full scans")
+        for table, sql in sorted(found):
+            print(f"  FAIL: scans {table}: {sql}")
+        failures += len(found)
+
+    # The constraints themselves
+    duplicate_alias = guest.post('/join_session/', {'code': quiz.code, 'username': 'Bot1'})
+    if b'already in this quiz' not in duplicate_alias.content:
+        print("FAIL: a second guest joined as an alias already in use")
+        failures += 1
+    rejoin = member.post('/join_session/', {'code': quiz.code, 'username': 'Member'})
+    if rejoin.status_code != 302 or QuizTaker.objects.filter(quiz=quiz, user=student).count() != 1:
+        print("FAIL: rejoining with an account did not reuse its taker")
+        failures += 1
+    for choice_id in (choice.id, question.choices.get(is_correct=False).id):
+        guest.post(f'/quiz/{quiz.code}/Guest1/answer/', {'question_id': question.id, 'choice_id': choice_id})
+    taker = QuizTaker.objects.get(quiz=quiz, alias='Guest1')
+    if list(taker.responses.values_list('selected_choice__is_correct', flat=True)) != [False] or taker.score != 0:
+        print("FAIL: changing an answer did not replace the stored one")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,102 @@
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+
+# Checks for per-question analytics: totals across several sessions match
+# what was answered, ending a session reads raw responses with a single
+# query, and the report page never touches UserResponse and costs the same
+# number of queries after 1 or 20 sessions.
+SESSIONS = 20
+RESPONSES_TABLE = '"QuizMania_userresponse"'
+
+
+def build_quiz(owner):
+    quiz = Quiz.objects.create(owner=owner, title="Analytics")
+    questions = []
+    for i in range(3):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=1)
+        choices = [Choice.objects.create(question=question, text=f"C{k}", is_correct=(k == 0)) for k in range(3)]
+        questions.append((question, choices))
+    return quiz, questions
+
+
+def play_session(owner_client, quiz, questions, session):
+    # Player p answers Q0 with choice p % 3, Q1 always right, and leaves Q2 blank
+    for p in range(3):
+        alias = f"S{session}P{p}"
+        client = Client(HTTP_HOST='localhost')
+        client.post('/join_session/', {'code': quiz.code, 'username': alias})
+        client.post(f'/quiz/{quiz.code}/{alias}/', {
+            f'question_{questions[0][0].id}': questions[0][1][p % 3].id,
+            f'question_{questions[1][0].id}': questions[1][1][0].id,
+        })
+    with CaptureQueriesContext(connection) as ctx:
+        owner_client.post(f'/quiz/{quiz.code}/end/')
+    return sum(1 for q in ctx.captured_queries if q['sql'].startswith('SELECT') and RESPONSES_TABLE in q['sql'])
+
+
+def report(owner_client, quiz):
+    with CaptureQueriesContext(connection) as ctx:
+        response = owner_client.get(f'/quiz/{quiz.code}/analytics/')
+    touched = any(RESPONSES_TABLE in q['sql'] for q in ctx.captured_queries)
+    return response.context['report'], len(ctx.captured_queries), touched
+
+
+def run():
+    owner = User.objects.create_user(username='analytics_owner', password='password')
+    owner_client = Client(HTTP_HOST='localhost')
+    owner_client.force_login(owner)
+    quiz, questions = build_quiz(owner)
+    failures = 0
+
+    reads = play_session(owner_client, quiz, questions, 0)
+    _, first_queries, _ = report(owner_client, quiz)
+    for session in range(1, SESSIONS):
+        reads = max(reads, play_session(owner_client, quiz, questions, session))
+    rows, queries, touched = report(owner_client, quiz)
+
+    attempts = 3 * SESSIONS
+    print(f"end session: {reads} read(s) of raw responses; report: {first_queries} queries after 1 session, "
+          f"{queries} after {SESSIONS}")
+    for row in rows:
+        print(f"  {row['question'].text}: {row['correct_percent']}% correct, {row['blank']} blank, "
+              f"picks {[c['picks'] for c in row['choices']]}")
+
+    expected = [
+        (33.3, 0, [SESSIONS] * 3),
+        (100.0, 0, [attempts, 0, 0]),
+        (0, attempts, [0, 0, 0]),
+    ]
+    actual = [(r['correct_percent'], r['blank'], [c['picks'] for c in r['choices']]) for r in rows]
+    if actual != expected or any(r['attempts'] != attempts for r in rows):
+        print(f"FAIL: expected {expected}")
+        failures += 1
+    if reads != 1:
+        print("FAIL: ending a session should read raw responses with exactly one query")
+        failures += 1
+    if touched:
+        print("FAIL: the report read raw responses")
+        failures += 1
+    if queries != first_queries:
+        print("FAIL: report cost grows with the number of sessions")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+
+# Checks for the shared quiz payload behind quiz_view: opening the quiz page
+# costs the same number of queries whatever the quiz size, later participants
+# are served from the cache, the JSON endpoint agrees with the page and
+# revalidates with its ETag, and saving the quiz rebuilds the payload.
+MAX_PAGE_QUERIES = 8
+
+
+def build_quiz(owner, num_questions):
+    quiz = Quiz.objects.create(owner=owner, title=f"Payload {num_questions}")
+    for i in range(num_questions):
+        # Text that would break out of an inline <script> if it were not escaped
+        question = Question.objects.create(quiz=quiz, text=f"Q{i} </script><b>\"x\"", marks=2)
+        Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+    return quiz
+
+
+def join(quiz, alias):
+    client = Client(HTTP_HOST='localhost')
+    client.post('/join_session/', {'code': quiz.code, 'username': alias})
+    return client
+
+
+def open_page(client, quiz, alias):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f'/quiz/{quiz.code}/{alias}/')
+    return response, len(ctx.captured_queries)
+
+
+def run():
+    owner = User.objects.create_user(username='payload_owner', password='password')
+    failures = 0
+    cold = {}
+
+    for size in (5, 40):
+        quiz = build_quiz(owner, size)
+        first, second = join(quiz, 'First'), join(quiz, 'Second')
+        page, cold[size] = open_page(first, quiz, 'First')
+        _, warm = open_page(second, quiz, 'Second')
+        print(f"{size:>3} questions: {cold[size]} queries first participant, {warm} for the next")
+
+        if cold[size] > MAX_PAGE_QUERIES:
+            print(f"FAIL: more than {MAX_PAGE_QUERIES} queries")
+            failures += 1
+        if warm >= cold[size]:
+            print("FAIL: second participant was not served from the cache")
+            failures += 1
+        if '</script><b>' in page.content.decode():
+            print("FAIL: question text is not escaped in the page")
+            failures += 1
+
+        response = first.get(f'/quiz/{quiz.code}/First/payload/')
+        data = json.loads(response.content)
+        if len(data) != size or [c['is_correct'] for c in data[0]['choices']] != [True, False]:
+            print("FAIL: JSON payload does not match the quiz")
+            failures += 1
+        if first.get(f'/quiz/{quiz.code}/First/payload/', HTTP_IF_NONE_MATCH=response['ETag']).status_code != 304:
+            print("FAIL: unchanged payload was not revalidated with 304")
+            failures += 1
+        if Client(HTTP_HOST='localhost').get(f'/quiz/{quiz.code}/Nobody/payload/').status_code != 403:
+            print("FAIL: payload served to a non-participant")
+            failures += 1
+
+        Question.objects.create(quiz=quiz, text="Added later", marks=1)
+        quiz.save()
+        data = json.loads(first.get(f'/quiz/{quiz.code}/First/payload/').content)
+        if len(data) != size + 1:
+            print("FAIL: payload not rebuilt after the quiz was saved")
+            failures += 1
+
+    if cold[5] != cold[40]:
+        print("FAIL: query count grows with the number of questions")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,81 @@
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice
+
+# Query-count regression check for check_answers_view.
+# A review must cost the same number of queries whatever the quiz size, a
+# repeat visit must be served from the review cache, and resubmitting must
+# show the new answers.
+MAX_REVIEW_QUERIES = 10
+
+
+def build_quiz(owner, num_questions):
+    quiz = Quiz.objects.create(owner=owner, title=f"Review {num_questions}")
+    right, wrong = {}, {}
+    for i in range(num_questions):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=2, explanation="Because.")
+        right[f'question_{question.id}'] = Choice.objects.create(question=question, text="Right", is_correct=True).id
+        wrong[f'question_{question.id}'] = Choice.objects.create(question=question, text="Wrong", is_correct=False).id
+    return quiz, right, wrong
+
+
+def review(client, quiz):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f'/quiz/{quiz.code}/check_answers/')
+    return response, len(ctx.captured_queries)
+
+
+def run():
+    owner = User.objects.create_user(username='review_owner', password='password')
+    failures = 0
+    cold = {}
+
+    for size in (5, 40):
+        quiz, right, wrong = build_quiz(owner, size)
+        alias = f"Guest{size}"
+        client = Client(HTTP_HOST='localhost')
+        client.post('/join_session/', {'code': quiz.code, 'username': alias})
+        client.post(f'/quiz/{quiz.code}/{alias}/', wrong)
+
+        response, cold[size] = review(client, quiz)
+        _, warm = review(client, quiz)
+        wrong_marks = response.content.decode().count('fa-times')
+
+        client.post(f'/quiz/{quiz.code}/{alias}/', right)
+        response, _ = review(client, quiz)
+        resubmitted_marks = response.content.decode().count('fa-times')
+        print(f"{size:>3} questions: {cold[size]} queries cold, {warm} cached, status {response.status_code}")
+
+        if wrong_marks != size or resubmitted_marks != 0:
+            print("FAIL: review does not match the latest submission")
+            failures += 1
+        if cold[size] > MAX_REVIEW_QUERIES:
+            print(f"FAIL: more than {MAX_REVIEW_QUERIES} queries")
+            failures += 1
+        if warm >= cold[size]:
+            print("FAIL: repeat visit was not served from the cache")
+            failures += 1
+
+    if cold[5] != cold[40]:
+        print("FAIL: query count grows with the number of questions")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,70 @@
+import os
+import sys
+import django
+
+# Setup Django
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'QM.settings')
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from django.contrib.auth.models import User
+from QuizMania.models import Quiz, Question, Choice, UserResponse
+
+# Query-count regression check for the quiz_view submit path.
+# Submitting a quiz must cost the same number of queries whatever its size.
+MAX_SUBMIT_QUERIES = 12
+
+
+def build_quiz(owner, num_questions):
+    quiz = Quiz.objects.create(owner=owner, title=f"Scoring {num_questions}")
+    answers = {}
+    for i in range(num_questions):
+        question = Question.objects.create(quiz=quiz, text=f"Q{i}", marks=2)
+        correct = Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+        answers[f'question_{question.id}'] = correct.id
+    return quiz, answers
+
+
+def submit(quiz, answers, alias):
+    client = Client(HTTP_HOST='localhost')
+    client.post('/join_session/', {'code': quiz.code, 'username': alias})
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(f'/quiz/{quiz.code}/{alias}/', answers)
+    return response, len(ctx.captured_queries)
+
+
+def run():
+    owner = User.objects.create_user(username='scoring_owner', password='password')
+    failures = 0
+    counts = {}
+
+    for size in (5, 50):
+        quiz, answers = build_quiz(owner, size)
+        response, count = submit(quiz, answers, f"Guest{size}")
+        taker = quiz.quiztaker_set.get()
+        counts[size] = count
+        print(f"{size:>3} questions: {count} queries, status {response.status_code}, score {taker.score}")
+
+        if taker.score != size * 2 or UserResponse.objects.filter(quiz_taker=taker).count() != size:
+            print("FAIL: wrong score or responses")
+            failures += 1
+        if count > MAX_SUBMIT_QUERIES:
+            print(f"FAIL: more than {MAX_SUBMIT_QUERIES} queries")
+            failures += 1
+
+    if counts[5] != counts[50]:
+        print("FAIL: query count grows with the number of questions")
+        failures += 1
+
+    print("PASS" if not failures else f"{failures} FAILURE(S)")
+    return failures
+
+
+if __name__ == '__main__':
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    sys.exit(1 if run() else 0)